@@ -0,0 +1,176 @@
+# app/config/schema.py
+# Schema management: explicit migration + a cheap, lazy schema check at runtime.
+#
+# Importing the app no longer runs DDL (create_all) or touches the database at all.
+# Instead:
+# - `python -m app.migrate` creates missing tables and records the schema fingerprint
+#   in the schema_version table. create_all never alters an existing table, so the live
+#   tables are compared with the models first (sqlalchemy.inspect); if one differs, nothing
+#   is stamped and the operator has to run a real migration (ALTER TABLE) first.
+# - At runtime, SCHEMA_STARTUP_MODE decides what happens on the first request that needs the DB:
+#     verify (default) -> read schema_version once and compare it with the models' fingerprint
+#     create           -> run the migration once (old behaviour, without the import-time cost)
+#     skip             -> do nothing (schema managed elsewhere)
+#   A successful check is cached for the life of the process, so later requests pay nothing.
+
+import asyncio
+import hashlib
+import os
+import threading
+from functools import lru_cache
+
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.config.database import Base, engine
+
+SCHEMA_STARTUP_MODE = os.getenv("SCHEMA_STARTUP_MODE", "verify")
+
+# Kept out of Base.metadata so it is not part of the fingerprint it stores
+version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    version_metadata,
+    Column("id", Integer, primary_key=True),                  # always 1 (single row)
+    Column("fingerprint", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
+)
+
+
+
+class SchemaDriftError(RuntimeError):
+    """An existing table does not match the models (create_all can't fix it)"""
+
+    def __init__(self, differences: list):
+        super().__init__("existing tables differ from the models:\n  " + "\n  ".join(differences))
+        self.differences = differences
+
+
+_lock = threading.Lock()
+_verified = False
+
+
+def _load_models() -> None:
+    # Importing the model modules registers their tables on Base.metadata
+    from app.models import category_model, company_model, product_model  # noqa: F401
+
+
+@lru_cache(maxsize=1)
+def fingerprint() -> str:
+    """sha256 of the DDL the models would generate (computed once, no DB access)"""
+    _load_models()
+    dialect = postgresql.dialect()
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return hashlib.sha256("\n".join(ddl).encode("utf-8")).hexdigest()
+
+
+def stored_fingerprint():
+    """Fingerprint recorded by the last migration, or None (no table / no row yet)"""
+    with engine.connect() as conn:
+        if not engine.dialect.has_table(conn, schema_version.name):
+            return None
+        return conn.execute(select(schema_version.c.fingerprint).where(schema_version.c.id == 1)).scalar()
+
+
+def schema_drift(conn) -> list:
+    """
+    Differences between the models and the tables that already exist in the database
+    (columns, types, nullability, indexes, unique constraints, foreign keys).
+    Tables that don't exist yet are not reported: create_all will create them.
+    """
+    _load_models()
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    differences = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        live = {c["name"]: c for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            found = live.get(column.name)
+            if found is None:
+                differences.append(f"{table.name}.{column.name}: column missing")
+                continue
+            # Compare the generic type (String, Integer, Float, ...), not the dialect spelling
+            if found["type"]._type_affinity is not column.type._type_affinity:
+                differences.append(f"{table.name}.{column.name}: type {found['type']} in the database, {column.type} in the model")
+            if not column.primary_key and found["nullable"] != column.nullable:
+                differences.append(f"{table.name}.{column.name}: nullable={found['nullable']} in the database, {column.nullable} in the model")
+        for name in sorted(set(live) - set(table.columns.keys())):
+            differences.append(f"{table.name}.{name}: column not in the model")
+
+        live_indexes = {i["name"]: tuple(i["column_names"]) for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if live_indexes.get(index.name) != tuple(c.name for c in index.columns):
+                differences.append(f"{table.name}: index {index.name} missing or on other columns")
+        # unique=True columns become UNIQUE constraints (or unique indexes, depending on the dialect)
+        live_unique = {tuple(u["column_names"]) for u in inspector.get_unique_constraints(table.name)}
+        live_unique |= {tuple(i["column_names"]) for i in inspector.get_indexes(table.name) if i["unique"]}
+        for column in table.columns:
+            if column.unique and (column.name,) not in live_unique:
+                differences.append(f"{table.name}.{column.name}: unique constraint missing")
+        live_fks = {
+            (tuple(fk["constrained_columns"]), fk["referred_table"])
+            for fk in inspector.get_foreign_keys(table.name)
+        }
+        for fk in table.foreign_key_constraints:
+            if (tuple(fk.column_keys), fk.referred_table.name) not in live_fks:
+                differences.append(f"{table.name}: foreign key {', '.join(fk.column_keys)} -> {fk.referred_table.name} missing")
+    return differences
+
+
+def migrate() -> str:
+    """
+    Create missing tables and record the current fingerprint.
+    Raises SchemaDriftError (and stamps nothing) when an existing table differs from the models.
+    """
+    _load_models()
+    with engine.begin() as conn:
+        differences = schema_drift(conn)
+        if differences:
+            raise SchemaDriftError(differences)
+        Base.metadata.create_all(bind=conn)
+        version_metadata.create_all(bind=conn)
+        current = fingerprint()
+        updated = conn.execute(schema_version.update().where(schema_version.c.id == 1).values(fingerprint=current))
+        if updated.rowcount == 0:
+            conn.execute(schema_version.insert().values(id=1, fingerprint=current))
+    return current
+
+
+async def require_schema() -> None:
+    """
+    Router dependency: make sure the schema is usable before the first DB request.
+    Only the first call (per process) does any work; failures are not cached, so running
+    the migration fixes a running server without a restart.
+    async on purpose: a sync dependency would cost a threadpool hop on every request,
+    so once verified it returns right away on the event loop and only the check itself
+    (blocking DB access) runs in a thread.
+    """
+    if _verified or SCHEMA_STARTUP_MODE == "skip":
+        return
+    await asyncio.to_thread(_check_schema)
+
+
+def _check_schema() -> None:
+    global _verified
+    with _lock:
+        if _verified:
+            return
+        if SCHEMA_STARTUP_MODE == "create":
+            try:
+                migrate()
+            except SchemaDriftError as e:
+                raise HTTPException(status_code=503, detail=f"Database schema is out of date: {e}")
+        elif stored_fingerprint() != fingerprint():
+            raise HTTPException(
+                status_code=503,
+                detail="Database schema is missing or out of date: run `python -m app.migrate`",
+            )
+        _verified = True
@@ -1,18 +1,22 @@
 # app/main.py
 
-from fastapi import FastAPI
-from app.config.database import Base, engine
+from fastapi import Depends, FastAPI
+from app.config.schema import require_schema
 from app.routes import product_routes, company_routes, category_routes
+from app.utils.profiler import install_profiler
 
-# Create all tables in DB (if they do not exist). This uses SQLAlchemy metadata.
-Base.metadata.create_all(bind=engine)
+# No DDL at import time: tables are created by `python -m app.migrate`, and the schema is
+# checked once, lazily, on the first request that uses the DB (see app/config/schema.py)
 
 app = FastAPI(title="Product Management API - Assignment 1")
 
+# Optional sampling profiler (PROFILE_ENABLED=1); no-op when disabled
+install_profiler(app)
+
 # Include routers for modular endpoints
-app.include_router(company_routes.router)
-app.include_router(category_routes.router)
-app.include_router(product_routes.router)
+app.include_router(company_routes.router, dependencies=[Depends(require_schema)])
+app.include_router(category_routes.router, dependencies=[Depends(require_schema)])
+app.include_router(product_routes.router, dependencies=[Depends(require_schema)])
 
 @app.get("/")
 def root():
@@ -0,0 +1,37 @@
+# app/migrate.py
+# Explicit schema migration command (replaces the old create_all at import time).
+#
+#   python -m app.migrate           -> create missing tables, record the schema fingerprint
+#   python -m app.migrate --check   -> only compare; exit code 1 when the DB is out of date
+# Existing tables are never altered: if one differs from the models, the command lists the
+# differences, stamps nothing and exits with code 1 (apply the ALTER TABLE yourself, then rerun).
+
+import argparse
+import sys
+
+from app.config.schema import SchemaDriftError, fingerprint, migrate, stored_fingerprint
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create / verify the Assignment1 database schema")
+    parser.add_argument("--check", action="store_true", help="only verify the recorded schema fingerprint")
+    args = parser.parse_args()
+
+    if args.check:
+        stored, expected = stored_fingerprint(), fingerprint()
+        if stored != expected:
+            print(f"schema out of date: database has {stored}, models expect {expected}")
+            sys.exit(1)
+        print(f"schema up to date ({expected})")
+        return
+
+    try:
+        print(f"schema migrated ({migrate()})")
+    except SchemaDriftError as e:
+        print(f"refusing to record the schema fingerprint: {e}")
+        print("run a real migration (ALTER TABLE ...) for these tables, then `python -m app.migrate` again")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
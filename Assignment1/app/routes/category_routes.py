@@ -7,8 +7,9 @@ from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.models.category_model import Category
 from app.schemas.category_schema import CategoryCreate, CategoryResponse
+from app.utils.profiler import ProfiledRoute   # profiles sync routes in their worker thread
 
-router = APIRouter(prefix="/categories", tags=["Categories"])
+router = APIRouter(prefix="/categories", tags=["Categories"], route_class=ProfiledRoute)
 
 @router.post("/", response_model=CategoryResponse)
 def create_category(payload: CategoryCreate, db: Session = Depends(get_db)):
@@ -7,8 +7,9 @@ from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.models.company_model import Company
 from app.schemas.company_schema import CompanyCreate, CompanyResponse
+from app.utils.profiler import ProfiledRoute   # profiles sync routes in their worker thread
 
-router = APIRouter(prefix="/companies", tags=["Companies"])
+router = APIRouter(prefix="/companies", tags=["Companies"], route_class=ProfiledRoute)
 
 @router.post("/", response_model=CompanyResponse)
 def create_company(payload: CompanyCreate, db: Session = Depends(get_db)):
@@ -1,17 +1,28 @@
 # app/routes/product_routes.py
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import json
+import os
+import zlib
 
-from app.config.database import get_db
+from app.config.database import get_db, SessionLocal
 from app.models.product_model import Product
-from app.schemas.product_schema import ProductCreate, ProductResponse
+from app.schemas.product_schema import ProductCreate, ProductResponse, ProductListResponse, ProductLookupRequest, ProductLookupResponse
 
 from app.models.category_model import Category
 from app.models.company_model import Company
+from app.utils.profiler import ProfiledRoute   # profiles sync routes in their worker thread
 
-router = APIRouter(prefix="/products", tags=["Products"])
+router = APIRouter(prefix="/products", tags=["Products"], route_class=ProfiledRoute)
+
+# Rows fetched per round trip by the streaming export (server-side cursor batch size)
+STREAM_BATCH_SIZE = 1000
+
+# Maximum number of ids accepted by POST /products/lookup
+LOOKUP_MAX_IDS = int(os.getenv("PRODUCT_LOOKUP_MAX_IDS", "200"))
 
 # Create product
 @router.post("/", response_model=ProductResponse)
@@ -35,30 +46,134 @@ def create_product(payload: ProductCreate, db: Session = Depends(get_db)):
 # def list_products(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
 #     return db.query(Product).offset(skip).limit(limit).all()
 # Read all (with pagination + include category/company names)
-@router.get("/", response_model=List[ProductResponse])
+@router.get("/", response_model=List[ProductListResponse])
 def list_products(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    products = (
-        db.query(Product)
+    rows = (
+        db.query(Product, Category.name.label("category_name"), Company.name.label("company_name"))
         .join(Category, Product.category_id == Category.id)
         .join(Company, Product.company_id == Company.id)
-        .add_columns(Product.id, Product.name, Product.price, Category.name.label("category_name"), Company.name.label("company_name"))
+        .order_by(Product.id)
         .offset(skip)
         .limit(limit)
         .all()
     )
-    # convert result into readable list
+    # all product columns plus the readable names
     return [
         {
-            "id": p.id,
-            "name": p.name,
-            "price": p.price,
-            "category_name": p.category_name,
-            "company_name": p.company_name
+            **{column.name: getattr(product, column.name) for column in Product.__table__.columns},
+            "category_name": category_name,
+            "company_name": company_name,
         }
-        for p in products
+        for product, category_name, company_name in rows
     ]
 
 
+# Batch get-by-ids: all products in one WHERE id IN (...) query, returned in request order
+@router.post("/lookup", response_model=ProductLookupResponse)
+def lookup_products(payload: ProductLookupRequest, db: Session = Depends(get_db)):
+    ids = list(dict.fromkeys(payload.ids))   # drop duplicates, keep order
+    if len(ids) > LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {LOOKUP_MAX_IDS} ids per lookup")
+    by_id = {p.id: p for p in db.query(Product).filter(Product.id.in_(ids)).all()}
+    return {
+        "products": [by_id[i] for i in ids if i in by_id],
+        "missing": [i for i in ids if i not in by_id],
+    }
+
+# Stream all (optionally filtered) products as NDJSON, one JSON object per line.
+# Uses a server-side cursor (yield_per) so only one batch is held in memory at a time.
+# Declared before "/{product_id}" so "stream" is not parsed as a product id.
+@router.get("/stream")
+def stream_products(
+    q: Optional[str] = Query(None, description="Search term for name or description"),
+    company_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|gzip)$", description="ndjson or gzip (gzip-compressed ndjson)"),
+):
+    lines = _iter_product_lines(q, company_id, category_id)
+    if format == "gzip":
+        return StreamingResponse(
+            _gzip_chunks(lines),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip"},
+        )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+def _iter_product_lines(q: Optional[str], company_id: Optional[int], category_id: Optional[int]):
+    # The session is opened here (not via Depends) so it stays open until the last row is sent
+    db = SessionLocal()
+    try:
+        query = db.query(
+            Product.id, Product.name, Product.description, Product.price,
+            Product.stock, Product.company_id, Product.category_id,
+        )
+        if q:
+            like_q = f"%{q}%"
+            query = query.filter((Product.name.ilike(like_q)) | (Product.description.ilike(like_q)))
+        if company_id:
+            query = query.filter(Product.company_id == company_id)
+        if category_id:
+            query = query.filter(Product.category_id == category_id)
+
+        # yield_per turns on stream_results, so psycopg2 uses a named (server-side) cursor
+        rows = query.order_by(Product.id).yield_per(STREAM_BATCH_SIZE)
+        batch = []
+        for r in rows:
+            batch.append(json.dumps({
+                "id": r.id,
+                "name": r.name,
+                "description": r.description,
+                "price": r.price,
+                "stock": r.stock,
+                "company_id": r.company_id,
+                "category_id": r.category_id,
+            }))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield ("\n".join(batch) + "\n").encode("utf-8")
+                batch = []
+        if batch:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
+    finally:
+        db.close()
+
+
+def _gzip_chunks(chunks):
+    # wbits=31 -> gzip container; compress incrementally as batches arrive
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Search API: q searches name and description, filter by company_id and category_id, pagination
+# Declared before "/{product_id}" so "search" is not parsed as a product id
+@router.get("/search", response_model=List[ProductResponse])
+def search_products(
+    q: Optional[str] = Query(None, description="Search term for name or description"),
+    company_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+):
+    query = db.query(Product)
+    if q:
+        like_q = f"%{q}%"
+        query = query.filter((Product.name.ilike(like_q)) | (Product.description.ilike(like_q)))
+    if company_id:
+        query = query.filter(Product.company_id == company_id)
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+    results = query.offset(skip).limit(limit).all()
+    if not results:
+        # return empty list instead of 404 for search (more user-friendly)
+        return []
+    return results
+
+
 # # Get single product by id
 # @router.get("/{product_id}", response_model=ProductResponse)
 # def get_product(product_id: int, db: Session = Depends(get_db)):
@@ -111,27 +226,3 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     db.delete(product)
     db.commit()
     return {"detail": "Product deleted"}
-
-# Search API: q searches name and description, filter by company_id and category_id, pagination
-@router.get("/search", response_model=List[ProductResponse])
-def search_products(
-    q: Optional[str] = Query(None, description="Search term for name or description"),
-    company_id: Optional[int] = None,
-    category_id: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 10,
-    db: Session = Depends(get_db),
-):
-    query = db.query(Product)
-    if q:
-        like_q = f"%{q}%"
-        query = query.filter((Product.name.ilike(like_q)) | (Product.description.ilike(like_q)))
-    if company_id:
-        query = query.filter(Product.company_id == company_id)
-    if category_id:
-        query = query.filter(Product.category_id == category_id)
-    results = query.offset(skip).limit(limit).all()
-    if not results:
-        # return empty list instead of 404 for search (more user-friendly)
-        return []
-    return results
@@ -19,3 +19,17 @@ class ProductResponse(ProductBase):
 
     class Config:
         orm_mode = True
+
+# GET /products item: the product plus its category and company names
+class ProductListResponse(ProductResponse):
+    category_name: str
+    company_name: str
+
+# Request body for POST /products/lookup
+class ProductLookupRequest(BaseModel):
+    ids: list[int] = Field(..., min_length=1)
+
+# Products in request order + ids that were not found
+class ProductLookupResponse(BaseModel):
+    products: list[ProductResponse]
+    missing: list[int]
@@ -0,0 +1,27 @@
+# app/utils/profiler.py
+# Optional sampling request profiler (PROFILE_ENABLED=1).
+# The implementation is shared by all three apps: pm_common.profiler (common/ at the repo root,
+# installed through requirements.txt). It is only imported when profiling is enabled.
+# Assignment1's routes are sync (def) and run in the threadpool, so it uses "thread" mode:
+# the routers are created with route_class=ProfiledRoute, which profiles inside the worker thread.
+
+import os
+
+from fastapi.routing import APIRoute
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+
+if PROFILE_ENABLED:
+    from pm_common.profiler import ProfiledRoute, install_profiler as _install_profiler
+else:
+    # Profiling off: plain routes and nothing installed
+    ProfiledRoute = APIRoute
+    _install_profiler = None
+
+
+def install_profiler(app) -> None:
+    if _install_profiler is not None:
+        _install_profiler(app, mode="thread")
+
+
+__all__ = ["ProfiledRoute", "install_profiler"]
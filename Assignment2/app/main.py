@@ -5,8 +5,11 @@
 # Import required modules
 # ----------------------------------------------
 from fastapi import FastAPI
-from prisma import Prisma
-from app.routes import product_routes, company_routes, category_routes
+from app.config.database import prisma, connect_db, disconnect_db
+from app.routes import product_routes, company_routes, category_routes, batch_routes, change_routes
+from pm_common.concurrency import install_concurrency_limiter   # shared: common/ at the repo root
+from app.utils.dimension_cache import dimensions
+from app.utils.profiler import install_profiler
 
 # ----------------------------------------------
 # Create FastAPI app instance
@@ -14,25 +17,33 @@ from app.routes import product_routes, company_routes, category_routes
 # (In Java: similar to creating a Spring Boot application class)
 app = FastAPI(title="Product Management API - Assignment 2 (Prisma Version)")
 
-# ----------------------------------------------
-# Initialize Prisma client
-# ----------------------------------------------
-# (In Java: similar to creating a Hibernate SessionFactory or JDBC connection)
-prisma = Prisma()
+# Optional sampling profiler (PROFILE_ENABLED=1); no-op when disabled
+install_profiler(app)
+
+# Per-route concurrency limit + bounded queue; sheds load with 503 when full
+concurrency = install_concurrency_limiter(app)
 
 # ----------------------------------------------
 # Startup and Shutdown events
 # ----------------------------------------------
-# These run automatically when the API starts or stops
+# These run automatically when the API starts or stops.
+# The one shared Prisma client (app/config/database.py) is connected here for the whole
+# life of the app; routes never connect/disconnect it themselves, because a disconnect in
+# one request would cut off every other request running on the same client.
+# (In Java: similar to a SessionFactory created once at boot and closed at shutdown)
 @app.on_event("startup")
 async def startup():
-    await prisma.connect()
-    print("Database connected successfully.")
+    await connect_db()
+    # Build the in-memory autocomplete index for /products/suggest
+    await product_routes.rebuild_suggest_index(prisma)
+    # Load companies/categories into memory and keep checking for outside changes
+    await dimensions.load(prisma)
+    dimensions.start(prisma)
 
 @app.on_event("shutdown")
 async def shutdown():
-    await prisma.disconnect()
-    print(" Database connection closed.")
+    await dimensions.stop()
+    await disconnect_db()
 
 # ----------------------------------------------
 # Include all routers (like Controllers in Java)
@@ -40,6 +51,8 @@ async def shutdown():
 app.include_router(company_routes.router)
 app.include_router(category_routes.router)
 app.include_router(product_routes.router)
+app.include_router(batch_routes.router)
+app.include_router(change_routes.router)
 
 # ----------------------------------------------
 # Root endpoint (simple test route)
@@ -48,6 +61,18 @@ app.include_router(product_routes.router)
 def root():
     return {"message": "Product Management API with Prisma is running successfully!"}
 
+# ----------------------------------------------
+# Metrics endpoint (coalescing / cache / load-shedding counters)
+# ----------------------------------------------
+@app.get("/metrics")
+def metrics():
+    return {
+        "product_reads": product_routes.product_reads.metrics(),
+        "suggest_index": product_routes.suggest_index.stats(),
+        "concurrency": concurrency.metrics(),
+        "dimensions": dimensions.stats(),
+    }
+
 
 
 
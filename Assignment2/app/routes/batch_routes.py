@@ -0,0 +1,117 @@
+# app/routes/batch_routes.py
+
+"""
+Batch Routes
+---------------
+POST /batch runs an ordered list of create/delete operations on products, companies and
+categories in ONE interactive Prisma transaction: either every operation is applied or none
+(change-log entries included).
+Later operations can reference ids created earlier in the same batch ("$<ref>") in the
+foreign-key fields (company_id, category_id) and in a delete's id; other fields are taken literally.
+In Java: similar to a @Transactional service method processing a list of commands.
+"""
+
+from datetime import timedelta
+
+from fastapi import APIRouter, HTTPException
+from prisma.errors import PrismaError
+from pydantic import ValidationError
+
+from app.config.database import prisma   # shared client, connected once at startup (main.py)
+from app.routes import product_routes
+from app.schemas.batch_schema import BatchOperation, BatchRequest, BatchResponse
+from app.schemas.category_schema import CategoryCreate
+from app.schemas.company_schema import CompanyCreate
+from app.schemas.product_schema import ProductCreate
+from app.utils.changelog import record_change
+from app.utils.dimension_cache import dimensions
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+CREATE_SCHEMAS = {"product": ProductCreate, "company": CompanyCreate, "category": CategoryCreate}
+# Only these fields may hold a "$<ref>"; a name like "$5 Gift Card" stays a plain string
+REF_FIELDS = {"company_id", "category_id"}
+
+
+class BatchError(Exception):
+    """An operation failed; the whole transaction is rolled back."""
+
+    def __init__(self, index: int, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.index = index
+        self.status_code = status_code
+
+
+def _resolve(value, refs: dict, index: int):
+    # "$name" -> id created earlier in this batch
+    if isinstance(value, str) and value.startswith("$"):
+        if value[1:] not in refs:
+            raise BatchError(index, f"Unknown reference '{value}'")
+        return refs[value[1:]]
+    return value
+
+
+async def _apply(tx, index: int, operation: BatchOperation, refs: dict) -> dict:
+    delegate = getattr(tx, operation.entity)
+
+    if operation.op == "create":
+        if operation.data is None:
+            raise BatchError(index, "create needs 'data'")
+        data = {
+            key: _resolve(value, refs, index) if key in REF_FIELDS else value
+            for key, value in operation.data.items()
+        }
+        try:
+            payload = CREATE_SCHEMAS[operation.entity](**data)
+        except ValidationError as e:
+            raise BatchError(index, str(e))
+        # Same duplicate rule as the single-entity create routes
+        if await delegate.find_first(where={"name": payload.name}):
+            raise BatchError(index, f"{operation.entity.capitalize()} already exists.")
+        created = await delegate.create(data=payload.dict())
+        await record_change(tx, operation.entity, "create", created)
+        if operation.ref:
+            if operation.ref in refs:
+                raise BatchError(index, f"Duplicate ref '{operation.ref}'")
+            refs[operation.ref] = created.id
+        return {"index": index, "op": "create", "entity": operation.entity, "id": created.id,
+                "ref": operation.ref, "record": created}
+
+    target_id = _resolve(operation.id, refs, index)
+    if not isinstance(target_id, int):
+        raise BatchError(index, "delete needs an integer 'id' or a '$ref'")
+    existing = await delegate.find_unique(where={"id": target_id})
+    if not existing:
+        raise BatchError(index, f"{operation.entity.capitalize()} {target_id} not found", status_code=404)
+    await delegate.delete(where={"id": target_id})
+    await record_change(tx, operation.entity, "delete", existing)
+    return {"index": index, "op": "delete", "entity": operation.entity, "id": target_id, "ref": operation.ref}
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(request: BatchRequest):
+    results = []
+    refs = {}   # ref name -> id created earlier in this batch
+    try:
+        async with prisma.tx(timeout=timedelta(seconds=30)) as tx:
+            for index, operation in enumerate(request.operations):
+                try:
+                    results.append(await _apply(tx, index, operation, refs))
+                except PrismaError as e:
+                    raise BatchError(index, str(e))
+    except BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail={"index": e.index, "error": str(e)})
+
+    # Transaction committed: keep the in-memory structures in sync
+    for result in results:
+        if result["entity"] != "product":
+            if result["op"] == "create":
+                dimensions[result["entity"]].put(result["record"])
+            else:
+                dimensions[result["entity"]].remove(result["id"])
+        elif result["op"] == "create":
+            product_routes.suggest_index.add(result["id"], result["record"].name)
+        else:
+            product_routes.product_reads.invalidate(result["id"])
+            product_routes.suggest_index.remove(result["id"])
+    return {"results": results}
@@ -6,49 +6,77 @@ Category Routes
 In Java: similar to a CategoryController with endpoints for CRUD operations.
 """
 
-from fastapi import APIRouter, HTTPException
-from prisma import Prisma
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.config.database import prisma   # shared client, connected once at startup (main.py)
 from app.schemas.category_schema import CategoryCreate, CategoryResponse
+from app.utils.changelog import record_change
+from app.utils.dimension_cache import dimensions
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE, fetch_page, iter_batches, ndjson_stream
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
-prisma = Prisma()
 
 @router.post("/", response_model=CategoryResponse)
 async def create_category(category: CategoryCreate):
-    await prisma.connect()
     existing = await prisma.category.find_first(where={"name": category.name})
     if existing:
-        await prisma.disconnect()
         raise HTTPException(status_code=400, detail="Category already exists.")
-    new_category = await prisma.category.create(data=category.dict())
-    await prisma.disconnect()
+    # Write the category and its change-log entry in one transaction
+    async with prisma.tx() as tx:
+        new_category = await tx.category.create(data=category.dict())
+        await record_change(tx, "category", "create", new_category)
+    dimensions["category"].put(new_category)
     return new_category
 
 @router.get("/", response_model=list[CategoryResponse])
-async def get_categories():
-    await prisma.connect()
-    categories = await prisma.category.find_many()
-    await prisma.disconnect()
+async def get_categories(
+    response: Response,
+    cursor: int | None = Query(None, description="Return rows with id greater than this (from X-Next-Cursor)"),
+    take: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    if dimensions.loaded:
+        # Served from the in-memory replica, no DB round trip
+        categories, next_cursor = dimensions["category"].page(cursor, take)
+    else:
+        categories, next_cursor = await fetch_page(prisma.category, cursor, take)
+    # Cursor for the next page goes in a header so the body stays a plain list
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
     return categories
 
+# Stream every category as NDJSON (for bulk consumers), fetched in keyset batches
+# Declared before "/{category_id}" so "stream" is not parsed as an id
+@router.get("/stream")
+async def stream_categories():
+    return StreamingResponse(_stream_categories(), media_type="application/x-ndjson")
+
+async def _stream_categories():
+    if dimensions.loaded:
+        async for chunk in ndjson_stream(dimensions["category"].batches(STREAM_BATCH_SIZE), ("id", "name")):
+            yield chunk
+        return
+    async for chunk in ndjson_stream(iter_batches(prisma.category), ("id", "name")):
+        yield chunk
+
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(category_id: int):
-    await prisma.connect()
-    category = await prisma.category.find_unique(where={"id": category_id})
-    await prisma.disconnect()
+    if dimensions.loaded:
+        category = dimensions["category"].rows.get(category_id)
+    else:
+        category = await prisma.category.find_unique(where={"id": category_id})
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
 @router.delete("/{category_id}")
 async def delete_category(category_id: int):
-    await prisma.connect()
     category = await prisma.category.find_unique(where={"id": category_id})
     if not category:
-        await prisma.disconnect()
         raise HTTPException(status_code=404, detail="Category not found")
-    await prisma.category.delete(where={"id": category_id})
-    await prisma.disconnect()
+    async with prisma.tx() as tx:
+        await tx.category.delete(where={"id": category_id})
+        await record_change(tx, "category", "delete", category)
+    dimensions["category"].remove(category_id)
     return {"message": "Category deleted successfully"}
 
 
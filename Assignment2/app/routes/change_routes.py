@@ -0,0 +1,28 @@
+# app/routes/change_routes.py
+
+"""
+Change Feed Routes
+---------------
+GET /changes?after=<seq>&limit=<n> returns product/company/category writes in commit order,
+so search indexers / warehouses can sync incrementally instead of re-reading every table.
+In Java: similar to a controller polling a transactional outbox table.
+"""
+
+from fastapi import APIRouter, Query
+from app.config.database import prisma   # shared client, connected once at startup (main.py)
+from app.schemas.change_schema import ChangeFeedResponse
+from app.utils.pagination import MAX_PAGE_SIZE
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+@router.get("", response_model=ChangeFeedResponse)
+async def get_changes(
+    after: int = Query(0, ge=0, description="Last seq the consumer has processed"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    changes = await prisma.changelog.find_many(
+        where={"seq": {"gt": after}},
+        order={"seq": "asc"},
+        take=limit,
+    )
+    return {"changes": changes, "next_after": changes[-1].seq if changes else after}
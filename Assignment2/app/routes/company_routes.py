@@ -7,39 +7,67 @@ In Java: similar to a Controller class that handles Company-related requests.
 Uses Prisma ORM for database operations.
 """
 
-from fastapi import APIRouter, HTTPException
-from prisma import Prisma
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.config.database import prisma   # shared client, connected once at startup (main.py)
 from app.schemas.company_schema import CompanyCreate, CompanyResponse
+from app.utils.changelog import record_change
+from app.utils.dimension_cache import dimensions
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE, fetch_page, iter_batches, ndjson_stream
 
 router = APIRouter(prefix="/companies", tags=["Companies"])
-prisma = Prisma()
 
 # Create a new company
 @router.post("/", response_model=CompanyResponse)
 async def create_company(company: CompanyCreate):
-    await prisma.connect()
     existing = await prisma.company.find_first(where={"name": company.name})
     if existing:
-        await prisma.disconnect()
         raise HTTPException(status_code=400, detail="Company already exists.")
-    new_company = await prisma.company.create(data=company.dict())
-    await prisma.disconnect()
+    # Write the company and its change-log entry in one transaction
+    async with prisma.tx() as tx:
+        new_company = await tx.company.create(data=company.dict())
+        await record_change(tx, "company", "create", new_company)
+    dimensions["company"].put(new_company)
     return new_company
 
 # Get all companies
 @router.get("/", response_model=list[CompanyResponse])
-async def get_companies():
-    await prisma.connect()
-    companies = await prisma.company.find_many()
-    await prisma.disconnect()
+async def get_companies(
+    response: Response,
+    cursor: int | None = Query(None, description="Return rows with id greater than this (from X-Next-Cursor)"),
+    take: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    if dimensions.loaded:
+        # Served from the in-memory replica, no DB round trip
+        companies, next_cursor = dimensions["company"].page(cursor, take)
+    else:
+        companies, next_cursor = await fetch_page(prisma.company, cursor, take)
+    # Cursor for the next page goes in a header so the body stays a plain list
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
     return companies
 
+# Stream every company as NDJSON (for bulk consumers), fetched in keyset batches
+# Declared before "/{company_id}" so "stream" is not parsed as an id
+@router.get("/stream")
+async def stream_companies():
+    return StreamingResponse(_stream_companies(), media_type="application/x-ndjson")
+
+async def _stream_companies():
+    if dimensions.loaded:
+        async for chunk in ndjson_stream(dimensions["company"].batches(STREAM_BATCH_SIZE), ("id", "name", "location")):
+            yield chunk
+        return
+    async for chunk in ndjson_stream(iter_batches(prisma.company), ("id", "name", "location")):
+        yield chunk
+
 # Get company by ID
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(company_id: int):
-    await prisma.connect()
-    company = await prisma.company.find_unique(where={"id": company_id})
-    await prisma.disconnect()
+    if dimensions.loaded:
+        company = dimensions["company"].rows.get(company_id)
+    else:
+        company = await prisma.company.find_unique(where={"id": company_id})
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
@@ -47,13 +75,13 @@ async def get_company(company_id: int):
 # Delete a company
 @router.delete("/{company_id}")
 async def delete_company(company_id: int):
-    await prisma.connect()
     company = await prisma.company.find_unique(where={"id": company_id})
     if not company:
-        await prisma.disconnect()
         raise HTTPException(status_code=404, detail="Company not found")
-    await prisma.company.delete(where={"id": company_id})
-    await prisma.disconnect()
+    async with prisma.tx() as tx:
+        await tx.company.delete(where={"id": company_id})
+        await record_change(tx, "company", "delete", company)
+    dimensions["company"].remove(company_id)
     return {"message": "Company deleted successfully"}
 
 
@@ -7,71 +7,161 @@ In Java: similar to ProductController or Service layer using Hibernate Repositor
 Includes CRUD + Search + Pagination.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from prisma import Prisma
-from app.schemas.product_schema import ProductCreate, ProductResponse
+from app.config.database import prisma   # shared client, connected once at startup (main.py)
+from app.schemas.product_schema import (
+    ProductCreate,
+    ProductResponse,
+    ProductWithRelatedResponse,
+    ProductPageResponse,
+    ProductLookupRequest,
+    ProductLookupResponse,
+)
+from app.utils.changelog import record_change
+from app.utils.fieldsets import find_products_sparse
+from app.utils.loaders import RelatedLoader
+from app.utils.pagination import iter_batches
+from app.utils.prefix_index import PrefixIndex
+from app.utils.single_flight import SingleFlight
 
 
 
 router = APIRouter(prefix="/products", tags=["Products"])
-prisma = Prisma()
+
+# Concurrent GET /products/{id} calls for the same id share one query.
+# PRODUCT_CACHE_TTL > 0 also keeps the result for that many seconds (micro-cache).
+product_reads = SingleFlight(ttl=float(os.getenv("PRODUCT_CACHE_TTL", "0")))
+
+# Autocomplete index of product names (built at startup, updated by create/delete)
+suggest_index = PrefixIndex(max_entries=int(os.getenv("SUGGEST_MAX_ENTRIES", "1000000")))
+
+
+async def rebuild_suggest_index(db: Prisma) -> None:
+    """Load every (id, name) in keyset batches and swap in a fresh index."""
+    items = []
+    async for rows in iter_batches(db.product):
+        items.extend((p.id, p.name) for p in rows)
+    suggest_index.rebuild(items)
+
+
+# Maximum number of ids accepted by POST /products/lookup
+LOOKUP_MAX_IDS = int(os.getenv("PRODUCT_LOOKUP_MAX_IDS", "200"))
+
+# ?fields=id,name,price,company.name -> fetch and return only those fields
+FIELDS_QUERY = Query(None, description="Comma separated fields, e.g. id,name,price,company.name")
+
+
+# Request-scoped loader: a new cache for every request
+def get_loader() -> RelatedLoader:
+    return RelatedLoader(prisma)
 
 # Create Product
 @router.post("/", response_model=ProductResponse)
 async def create_product(product: ProductCreate):
-    await prisma.connect()
     # check duplicate
     existing = await prisma.product.find_first(where={"name": product.name})
     if existing:
-        await prisma.disconnect()
         raise HTTPException(status_code=400, detail="Product already exists.")
-    new_product = await prisma.product.create(data=product.dict())
-    await prisma.disconnect()
+    # Write the product and its change-log entry in one transaction
+    async with prisma.tx() as tx:
+        new_product = await tx.product.create(data=product.dict())
+        await record_change(tx, "product", "create", new_product)
+    suggest_index.add(new_product.id, new_product.name)
     return new_product
 
-# Get all products with company and category names
-@router.get("/", response_model=list[ProductResponse])
-async def get_products(skip: int = 0, limit: int = 10):
-    await prisma.connect()
-    products = await prisma.product.find_many(
-        skip=skip,
-        take=limit,
-        include={           # this will also fetch related company and category
-            "company": True,
-            "category": True
-        }
-    )
-    await prisma.disconnect()
-    return products
+# Get all products; with include_related=true the distinct companies and categories
+# on the page are batch-loaded (one query each) and returned alongside the products
+@router.get("/", response_model=list[ProductResponse] | ProductPageResponse)
+async def get_products(
+    skip: int = 0,
+    limit: int = 10,
+    include_related: bool = False,
+    fields: str | None = FIELDS_QUERY,
+    loader: RelatedLoader = Depends(get_loader),
+):
+    if fields:
+        # Sparse fieldset: only the requested columns/relations, returned without re-serializing
+        return JSONResponse(await find_products_sparse(prisma, fields, skip, limit))
+    products = await prisma.product.find_many(skip=skip, take=limit)
+    if not include_related:
+        return products
+    companies, categories = await loader.load_for(products)
+    return {
+        "products": products,
+        "companies": list(companies.values()),
+        "categories": list(categories.values()),
+    }
+
 
+# Fetch many products by id with one `WHERE id IN (...)` query (cart / order services)
+@router.post("/lookup", response_model=ProductLookupResponse)
+async def lookup_products(request: ProductLookupRequest):
+    ids = list(dict.fromkeys(request.ids))   # de-duplicate, keep request order
+    if len(ids) > LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {LOOKUP_MAX_IDS} ids per lookup")
+    rows = await prisma.product.find_many(where={"id": {"in": ids}})
+    by_id = {p.id: p for p in rows}
+    return {
+        "products": [by_id[i] for i in ids if i in by_id],
+        "missing": [i for i in ids if i not in by_id],
+    }
 
-# Get single product by ID (with company and category names)
-@router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int):
-    await prisma.connect()
-    product = await prisma.product.find_unique(
-        where={"id": product_id},
-        include={           # also fetch company and category details
-            "company": True,
-            "category": True
-        }
-    )
-    await prisma.disconnect()
+# Autocomplete: product names starting with `prefix` (served from memory, no DB query)
+# Declared before "/{product_id}" so "suggest" is not parsed as an id
+@router.get("/suggest")
+async def suggest_products(
+    prefix: str = Query(..., min_length=1, description="Beginning of the product name"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    return suggest_index.suggest(prefix, limit)
+
+# Rebuild the autocomplete index from the database (e.g. after bulk changes made elsewhere)
+@router.post("/suggest/rebuild")
+async def rebuild_suggestions():
+    await rebuild_suggest_index(prisma)
+    return suggest_index.stats()
+
+
+# Get single product by ID (company and category batch-loaded when include_related=true)
+# Identical concurrent reads are coalesced into one find_unique by product_reads.
+# exclude_unset: "company"/"category" only appear in the response when include_related=true
+@router.get("/{product_id}", response_model=ProductWithRelatedResponse, response_model_exclude_unset=True)
+async def get_product(
+    product_id: int,
+    include_related: bool = False,
+    loader: RelatedLoader = Depends(get_loader),
+):
+    product = await product_reads.do(product_id, lambda: _fetch_product(product_id))
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    if not include_related:
+        return product.dict(exclude={"company", "category"})
+    companies, categories = await loader.load_for([product])
+    return {
+        **product.dict(exclude={"company", "category"}),
+        "company": companies.get(product.company_id),
+        "category": categories.get(product.category_id),
+    }
+
+async def _fetch_product(product_id: int):
+    return await prisma.product.find_unique(where={"id": product_id})
 
 
 # Delete product
 @router.delete("/{product_id}")
 async def delete_product(product_id: int):
-    await prisma.connect()
     product = await prisma.product.find_unique(where={"id": product_id})
     if not product:
-        await prisma.disconnect()
         raise HTTPException(status_code=404, detail="Product not found")
-    await prisma.product.delete(where={"id": product_id})
-    await prisma.disconnect()
+    async with prisma.tx() as tx:
+        await tx.product.delete(where={"id": product_id})
+        await record_change(tx, "product", "delete", product)
+    product_reads.invalidate(product_id)
+    suggest_index.remove(product_id)
     return {"message": "Product deleted successfully"}
 
 # Search products by name, category, price, or company
@@ -80,9 +170,11 @@ async def search_products(
     q: str = Query("", description="Search keyword"),
     company_id: int | None = None,
     skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    fields: str | None = FIELDS_QUERY,
 ):
-    await prisma.connect()
+    if fields:
+        return JSONResponse(await find_products_sparse(prisma, fields, skip, limit, q=q, company_id=company_id))
     where_clause = {
         "OR": [
             {"name": {"contains": q, "mode": "insensitive"}},
@@ -92,7 +184,6 @@ async def search_products(
     if company_id:
         where_clause["company_id"] = company_id
     products = await prisma.product.find_many(where=where_clause, skip=skip, take=limit)
-    await prisma.disconnect()
     return products
 
 
@@ -0,0 +1,38 @@
+# app/schemas/batch_schema.py
+# Pydantic models for POST /batch
+# -----------------------------------------------
+# In Java: similar to request/response DTOs for a bulk "unit of work" endpoint
+import os
+from typing import Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_OPERATIONS = int(os.getenv("MAX_BATCH_OPERATIONS", "500"))
+
+# One operation in the batch.
+# - create: `data` holds the same fields as the normal create endpoint.
+#           Give it a `ref` to use the new id later in the batch as "$<ref>"
+#           (only in company_id / category_id; other fields are never treated as references).
+# - delete: `id` is a number or a "$<ref>" created earlier in the batch.
+# Example: {"op": "create", "entity": "company", "ref": "acme", "data": {"name": "Acme"}}
+#          {"op": "create", "entity": "product", "data": {..., "company_id": "$acme"}}
+class BatchOperation(BaseModel):
+    op: Literal["create", "delete"]
+    entity: Literal["product", "company", "category"]
+    data: Optional[dict] = None
+    id: Optional[Union[int, str]] = None
+    ref: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+# Result of one operation, in the same order as the request
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    entity: str
+    id: int
+    ref: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: list[BatchOperationResult]
@@ -0,0 +1,25 @@
+# app/schemas/change_schema.py
+# Pydantic models for the change feed (GET /changes)
+# -----------------------------------------------
+# In Java: similar to DTOs returned by an event/outbox polling endpoint
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+# One entry of the change log
+class ChangeResponse(BaseModel):
+    seq: int
+    entity: str
+    entity_id: int
+    op: str
+    data: Optional[dict] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+# A page of the feed; pass `next_after` as `after` on the next call
+class ChangeFeedResponse(BaseModel):
+    changes: list[ChangeResponse]
+    next_after: int
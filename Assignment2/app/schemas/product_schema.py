@@ -3,6 +3,9 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from app.schemas.category_schema import CategoryResponse
+from app.schemas.company_schema import CompanyResponse
+
 class ProductBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -19,3 +22,23 @@ class ProductResponse(ProductBase):
 
     class Config:
         orm_mode = True
+
+# Single product together with its company and category (loaded by RelatedLoader)
+class ProductWithRelatedResponse(ProductResponse):
+    company: Optional[CompanyResponse] = None
+    category: Optional[CategoryResponse] = None
+
+# A page of products plus the distinct companies/categories they reference (each sent once)
+class ProductPageResponse(BaseModel):
+    products: list[ProductResponse]
+    companies: list[CompanyResponse]
+    categories: list[CategoryResponse]
+
+# POST /products/lookup: fetch many products by id in one query
+class ProductLookupRequest(BaseModel):
+    ids: list[int] = Field(..., min_length=1)
+
+# Products in request order, plus the ids that don't exist
+class ProductLookupResponse(BaseModel):
+    products: list[ProductResponse]
+    missing: list[int]
@@ -0,0 +1,34 @@
+# app/utils/changelog.py
+"""
+Change log (transactional outbox) helpers.
+
+Purpose:
+- Every product/company/category write also inserts a ChangeLog row inside the SAME Prisma
+  transaction, so the feed can never miss or invent a change.
+- The feed is read with GET /changes?after=<seq>; consumers sync at O(changes) cost.
+
+Ordering:
+- `seq` comes from a sequence, and two concurrent transactions could commit their rows out of
+  order (seq 11 visible before seq 10), which would make a consumer skip seq 10.
+  A transaction-scoped advisory lock serializes change-log writers so commit order matches seq order.
+
+Java comparison:
+- Similar to writing an outbox entity in the same @Transactional method as the aggregate.
+"""
+
+from prisma import Json
+
+# Arbitrary constant identifying "the change log writer" advisory lock
+CHANGE_LOG_LOCK_ID = 7300001
+
+
+async def record_change(tx, entity: str, op: str, record) -> None:
+    """Append one change for `record` (a Prisma model) using transaction client `tx`."""
+    await tx.query_raw("SELECT 1 AS locked FROM pg_advisory_xact_lock($1)", CHANGE_LOG_LOCK_ID)
+    data = record.dict(exclude={"products", "company", "category"})
+    await tx.changelog.create(data={
+        "entity": entity,
+        "entity_id": record.id,
+        "op": op,
+        "data": Json(data),
+    })
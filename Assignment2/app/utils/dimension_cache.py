@@ -0,0 +1,136 @@
+# app/utils/dimension_cache.py
+"""
+In-memory replica of the Company and Category (dimension) tables.
+
+Purpose:
+- Companies and categories rarely change, so keep a full copy in memory and serve
+  list/detail reads (and the product loader) from it without touching Postgres.
+- Loaded at startup; the create/delete routes update it right after their write.
+- A background task compares a cheap per-table fingerprint (row count, max id and a sum of
+  row hashes) every DIMENSION_REFRESH_SECONDS and reloads a table when another process changed it.
+
+Java comparison:
+- Similar to a Hibernate second-level cache for read-mostly entities with a periodic
+  "version check" query instead of cluster-wide invalidation.
+"""
+
+import asyncio
+import bisect
+import os
+
+from prisma import Prisma
+
+from app.utils.pagination import iter_batches
+
+REFRESH_SECONDS = float(os.getenv("DIMENSION_REFRESH_SECONDS", "30"))
+
+# kind -> (Prisma table name, columns hashed by the fingerprint query)
+TABLES = {
+    "company": ('"Company"', "id, name, location"),
+    "category": ('"Category"', "id, name"),
+}
+
+
+class DimensionTable:
+    """All rows of one table, by id, plus a sorted id list for cursor pagination."""
+
+    def __init__(self):
+        self.rows = {}
+        self.ids = []
+        self.fingerprint = None
+
+    def replace(self, rows, fingerprint) -> None:
+        by_id = {row.id: row for row in rows}
+        self.rows, self.ids, self.fingerprint = by_id, sorted(by_id), fingerprint
+
+    def put(self, row) -> None:
+        if row.id not in self.rows:
+            bisect.insort(self.ids, row.id)
+        self.rows[row.id] = row
+
+    def remove(self, row_id: int) -> None:
+        if self.rows.pop(row_id, None) is not None:
+            del self.ids[bisect.bisect_left(self.ids, row_id)]
+
+    def page(self, cursor: int | None, take: int) -> tuple:
+        """Same contract as pagination.fetch_page: (rows, next_cursor)."""
+        start = 0 if cursor is None else bisect.bisect_right(self.ids, cursor)
+        page_ids = self.ids[start:start + take]
+        next_cursor = page_ids[-1] if start + take < len(self.ids) else None
+        return [self.rows[i] for i in page_ids], next_cursor
+
+    async def batches(self, size: int):
+        """Async like pagination.iter_batches, so both plug into ndjson_stream."""
+        ids = list(self.ids)   # snapshot, so concurrent writes don't break the iteration
+        for start in range(0, len(ids), size):
+            yield [self.rows[i] for i in ids[start:start + size] if i in self.rows]
+
+
+class DimensionReplica:
+    def __init__(self):
+        self.tables = {kind: DimensionTable() for kind in TABLES}
+        self.loaded = False
+        self.reloads = 0
+        self._task = None
+
+    def __getitem__(self, kind: str) -> DimensionTable:
+        return self.tables[kind]
+
+    async def _fingerprint(self, db: Prisma, kind: str) -> tuple:
+        table, columns = TABLES[kind]
+        rows = await db.query_raw(
+            f"SELECT COUNT(*)::int AS n, COALESCE(MAX(id), 0)::int AS max_id, "
+            f"COALESCE(SUM(hashtext(concat_ws('|', {columns}))::bigint), 0)::text AS h FROM {table}"
+        )
+        return rows[0]["n"], rows[0]["max_id"], rows[0]["h"]
+
+    async def reload(self, db: Prisma, kind: str) -> None:
+        fingerprint = await self._fingerprint(db, kind)
+        rows = []
+        async for batch in iter_batches(getattr(db, kind)):
+            rows.extend(batch)
+        self.tables[kind].replace(rows, fingerprint)
+        self.reloads += 1
+
+    async def load(self, db: Prisma) -> None:
+        for kind in TABLES:
+            await self.reload(db, kind)
+        self.loaded = True
+
+    async def check(self, db: Prisma) -> None:
+        """Reload any table whose fingerprint no longer matches the replica."""
+        for kind in TABLES:
+            if await self._fingerprint(db, kind) != self.tables[kind].fingerprint:
+                await self.reload(db, kind)
+
+    def start(self, db: Prisma, interval: float = REFRESH_SECONDS) -> None:
+        async def refresh_loop():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.check(db)
+                except Exception as e:
+                    # Keep serving the last good snapshot; try again next round
+                    print(f"Dimension replica refresh failed: {e}")
+
+        self._task = asyncio.create_task(refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "reloads": self.reloads,
+            **{f"{kind}_rows": len(table.rows) for kind, table in self.tables.items()},
+        }
+
+
+# Shared replica for the whole app (loaded in main.py startup)
+dimensions = DimensionReplica()
@@ -0,0 +1,105 @@
+# app/utils/fieldsets.py
+"""
+Sparse fieldsets: `?fields=id,name,price,company.name`.
+
+Purpose:
+- Fetch only the requested product columns (and only join company/category when one of
+  their fields is requested), then return the rows as-is without response-model serialization.
+- Prisma Client Python has no `select` argument (only pre-generated partial types), so the
+  projection is built as a raw SQL select list. Column names come from a whitelist below;
+  user values are always passed as query parameters ($1, $2, ...).
+
+Java comparison:
+- Similar to a JPA constructor-expression / Tuple query built from a whitelist of attributes.
+"""
+
+from fastapi import HTTPException
+
+PRODUCT_FIELDS = ("id", "name", "description", "price", "stock", "company_id", "category_id")
+RELATION_FIELDS = {
+    "company": ("id", "name", "location"),
+    "category": ("id", "name"),
+}
+# Relation -> (table, alias, foreign key column on Product)
+RELATION_TABLES = {
+    "company": ('"Company"', "c", "company_id"),
+    "category": ('"Category"', "cat", "category_id"),
+}
+
+
+def parse_fields(fields: str) -> tuple:
+    """
+    "id,name,company.name" -> (["id", "name"], {"company": ["name"]}).
+    Raises 400 for unknown fields so typos don't silently return nothing.
+    """
+    base, relations = [], {}
+    for raw in fields.split(","):
+        field = raw.strip()
+        if not field:
+            continue
+        if "." in field:
+            relation, column = field.split(".", 1)
+            if column not in RELATION_FIELDS.get(relation, ()):
+                raise HTTPException(status_code=400, detail=f"Unknown field '{field}'")
+            if column not in relations.setdefault(relation, []):
+                relations[relation].append(column)
+        else:
+            if field not in PRODUCT_FIELDS:
+                raise HTTPException(status_code=400, detail=f"Unknown field '{field}'")
+            if field not in base:
+                base.append(field)
+    if not base and not relations:
+        raise HTTPException(status_code=400, detail="'fields' must name at least one field")
+    return base, relations
+
+
+def build_select(base: list, relations: dict) -> tuple:
+    """Return (select list, join clause) for the parsed fieldset."""
+    columns = [f'p."{column}" AS "{column}"' for column in base]
+    joins = []
+    for relation, relation_columns in relations.items():
+        table, alias, fk = RELATION_TABLES[relation]
+        joins.append(f'LEFT JOIN {table} {alias} ON {alias}."id" = p."{fk}"')
+        columns.extend(f'{alias}."{column}" AS "{relation}.{column}"' for column in relation_columns)
+    return ", ".join(columns), " ".join(joins)
+
+
+def nest(row: dict) -> dict:
+    """{"id": 1, "company.name": "Acme"} -> {"id": 1, "company": {"name": "Acme"}}"""
+    out = {}
+    for key, value in row.items():
+        if "." in key:
+            relation, column = key.split(".", 1)
+            out.setdefault(relation, {})[column] = value
+        else:
+            out[key] = value
+    return out
+
+
+def escape_like(text: str) -> str:
+    """Escape LIKE wildcards so the search term matches literally (like Prisma's `contains`)."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def find_products_sparse(db, fields: str, skip: int, limit: int,
+                               q: str | None = None, company_id: int | None = None) -> list:
+    """Run the projected product query and return nested dicts."""
+    base, relations = parse_fields(fields)
+    select_list, joins = build_select(base, relations)
+
+    conditions, params = [], []
+    if q:
+        params.append(f"%{escape_like(q)}%")
+        conditions.append(f'(p."name" ILIKE ${len(params)} OR p."description" ILIKE ${len(params)})')
+    if company_id:
+        params.append(company_id)
+        conditions.append(f'p."company_id" = ${len(params)}')
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.extend([limit, skip])
+
+    sql = (
+        f'SELECT {select_list} FROM "Product" p {joins} {where} '
+        f'ORDER BY p."id" LIMIT ${len(params) - 1} OFFSET ${len(params)}'
+    )
+    rows = await db.query_raw(sql, *params)
+    return [nest(row) for row in rows]
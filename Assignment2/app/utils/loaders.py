@@ -0,0 +1,57 @@
+# app/utils/loaders.py
+"""
+Batched related-entity loader (request scoped).
+
+Purpose:
+- A page of products repeats the same few companies/categories many times.
+  Instead of `include={"company": True, "category": True}` (related rows fetched per product),
+  collect the distinct company_id / category_id values of the page and fetch each set once
+  with a single `WHERE id IN (...)` query.
+- Rows already loaded during the same request are served from the loader's cache, and
+  when the in-memory dimension replica is loaded no query is needed at all.
+
+Java comparison:
+- Similar to a DataLoader / Hibernate batch fetching (@BatchSize) scoped to one request.
+"""
+
+from prisma import Prisma
+
+from app.utils.dimension_cache import dimensions
+
+
+class RelatedLoader:
+    def __init__(self, db: Prisma):
+        self.db = db
+        self.companies = {}     # company_id -> Company
+        self.categories = {}    # category_id -> Category
+        self.query_count = 0    # number of DB round trips issued by this loader
+
+    async def load_companies(self, ids) -> dict:
+        if dimensions.loaded:
+            table = dimensions["company"].rows
+            return {i: table[i] for i in ids if i in table}
+        missing = sorted({i for i in ids if i not in self.companies})
+        if missing:
+            rows = await self.db.company.find_many(where={"id": {"in": missing}})
+            self.query_count += 1
+            for row in rows:
+                self.companies[row.id] = row
+        return {i: self.companies[i] for i in ids if i in self.companies}
+
+    async def load_categories(self, ids) -> dict:
+        if dimensions.loaded:
+            table = dimensions["category"].rows
+            return {i: table[i] for i in ids if i in table}
+        missing = sorted({i for i in ids if i not in self.categories})
+        if missing:
+            rows = await self.db.category.find_many(where={"id": {"in": missing}})
+            self.query_count += 1
+            for row in rows:
+                self.categories[row.id] = row
+        return {i: self.categories[i] for i in ids if i in self.categories}
+
+    async def load_for(self, products) -> tuple:
+        """Return (companies, categories) dicts for the given products, two queries at most."""
+        companies = await self.load_companies([p.company_id for p in products])
+        categories = await self.load_categories([p.category_id for p in products])
+        return companies, categories
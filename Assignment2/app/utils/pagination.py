@@ -0,0 +1,55 @@
+# app/utils/pagination.py
+"""
+Keyset (cursor) pagination and NDJSON streaming helpers.
+
+Purpose:
+- Page through a table ordered by id: `WHERE id > cursor ORDER BY id LIMIT take`.
+  Unlike skip/offset this costs the same on page 1 and page 10,000.
+- Cap the page size so one request can't load a whole table into a worker's memory.
+- Stream a whole table as NDJSON (one JSON object per line) batch by batch.
+
+Java comparison:
+- Similar to Spring Data's keyset scrolling (ScrollPosition) plus a StreamingResponseBody.
+"""
+
+import json
+import os
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+
+async def fetch_page(delegate, cursor: int | None, take: int, where: dict | None = None) -> tuple:
+    """
+    Return (rows, next_cursor) for one page of `delegate` (e.g. prisma.company).
+    next_cursor is the id to pass as `cursor` for the next page, or None on the last page.
+    """
+    where = dict(where or {})
+    if cursor is not None:
+        where["id"] = {"gt": cursor}
+    # Fetch one extra row to know whether another page exists
+    rows = await delegate.find_many(where=where, take=take + 1, order={"id": "asc"})
+    if len(rows) > take:
+        rows = rows[:take]
+        return rows, rows[-1].id
+    return rows, None
+
+
+async def iter_batches(delegate, batch_size: int = STREAM_BATCH_SIZE, where: dict | None = None):
+    """Yield successive keyset pages until the table is exhausted."""
+    cursor = None
+    while True:
+        rows, cursor = await fetch_page(delegate, cursor, batch_size, where)
+        if rows:
+            yield rows
+        if cursor is None:
+            return
+
+
+async def ndjson_stream(batches, fields: tuple):
+    """Turn batches of rows into NDJSON bytes, one chunk per batch."""
+    async for rows in batches:
+        yield "".join(
+            json.dumps({f: getattr(row, f) for f in fields}) + "\n" for row in rows
+        ).encode("utf-8")
@@ -0,0 +1,91 @@
+# app/utils/prefix_index.py
+"""
+In-memory prefix index for product-name autocomplete.
+
+Purpose:
+- Keep a sorted list of normalized product names so "all names starting with X" is a
+  binary search (bisect) plus a short scan, instead of a `contains` + `insensitive` DB scan.
+- Built once at startup, kept current by the create/delete routes, rebuildable on demand.
+- Memory is bounded: at most `max_entries` names, each key cut to `max_key_length` characters.
+
+Java comparison:
+- Similar to keeping a TreeMap<String, Long> and calling subMap(prefix, prefix + '\\uffff').
+"""
+
+import bisect
+import re
+import unicodedata
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Case-fold, strip accents and collapse whitespace: "  Café  Latte" -> "cafe latte"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _SPACES.sub(" ", text).strip().casefold()
+
+
+class PrefixIndex:
+    def __init__(self, max_entries: int = 1_000_000, max_key_length: int = 64):
+        self.max_entries = max_entries
+        self.max_key_length = max_key_length
+        self._keys = []      # sorted list of (normalized_name, id)
+        self._names = {}     # id -> (normalized_name, display name)
+        self.dropped = 0     # names not indexed because the index was full
+
+    def _key(self, name: str) -> str:
+        return normalize(name)[: self.max_key_length]
+
+    def rebuild(self, items) -> None:
+        """Replace the whole index from an iterable of (id, name) pairs."""
+        names = {}
+        dropped = 0
+        for product_id, name in items:
+            if len(names) >= self.max_entries:
+                dropped += 1
+                continue
+            names[product_id] = (self._key(name), name)
+        keys = sorted((key, product_id) for product_id, (key, _) in names.items())
+        # Swap in one step so readers never see a half-built index
+        self._names, self._keys, self.dropped = names, keys, dropped
+
+    def add(self, product_id: int, name: str) -> None:
+        if product_id in self._names:
+            self.remove(product_id)
+        if len(self._names) >= self.max_entries:
+            self.dropped += 1
+            return
+        key = self._key(name)
+        self._names[product_id] = (key, name)
+        bisect.insort(self._keys, (key, product_id))
+
+    def remove(self, product_id: int) -> None:
+        entry = self._names.pop(product_id, None)
+        if entry is None:
+            return
+        pos = bisect.bisect_left(self._keys, (entry[0], product_id))
+        if pos < len(self._keys) and self._keys[pos] == (entry[0], product_id):
+            del self._keys[pos]
+
+    def suggest(self, prefix: str, limit: int = 10) -> list:
+        """Return up to `limit` {"id", "name"} dicts whose normalized name starts with prefix."""
+        key = self._key(prefix)
+        if not key:
+            return []
+        keys = self._keys
+        pos = bisect.bisect_left(keys, (key,))
+        results = []
+        while pos < len(keys) and len(results) < limit and keys[pos][0].startswith(key):
+            product_id = keys[pos][1]
+            results.append({"id": product_id, "name": self._names[product_id][1]})
+            pos += 1
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._keys),
+            "max_entries": self.max_entries,
+            "dropped": self.dropped,
+            "complete": self.dropped == 0,
+        }
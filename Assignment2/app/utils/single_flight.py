@@ -0,0 +1,82 @@
+# app/utils/single_flight.py
+"""
+Single-flight request coalescing with an optional short-TTL micro-cache.
+
+Purpose:
+- When many concurrent requests ask for the same key (e.g. a featured product), only the
+  first one runs the Prisma query; the others await the same in-flight result.
+- Optionally keep the result for `ttl` seconds so a burst right after the query also skips the DB.
+  A None result (not found) is never kept, so a row created right after a 404 shows up at once.
+- Count calls / executions / coalesced waiters / cache hits for the /metrics endpoint.
+
+Java comparison:
+- Similar to Caffeine's AsyncLoadingCache (one CompletableFuture per key) with expireAfterWrite.
+"""
+
+import asyncio
+import time
+
+
+class SingleFlight:
+    def __init__(self, ttl: float = 0.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight = {}      # key -> asyncio.Task running the loader
+        self._cache = {}         # key -> (expires_at, value)
+        self._generation = {}    # key -> bumped by invalidate(), stops stale results being cached
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def do(self, key, fn):
+        """Return fn()'s result for `key`, sharing one execution between concurrent callers."""
+        self.calls += 1
+        if self.ttl > 0:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self.cache_hits += 1
+                    return cached[1]
+                del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            # Run as its own task so one cancelled caller doesn't cancel everyone else
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            generation = self._generation.get(key, 0)
+            task.add_done_callback(lambda t: self._finish(key, t, generation))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task, generation: int) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        # Don't cache misses: a product created right after a 404 must be visible immediately
+        if task.result() is None:
+            return
+        if self.ttl > 0 and self._generation.get(key, 0) == generation:
+            if len(self._cache) >= self.max_entries:
+                # dicts keep insertion order: drop the oldest entry
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (time.monotonic() + self.ttl, task.result())
+
+    def invalidate(self, key) -> None:
+        """Forget the cached value (call after the underlying row changes)."""
+        self._cache.pop(key, None)
+        self._generation[key] = self._generation.get(key, 0) + 1
+
+    def metrics(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._inflight),
+            "cached_keys": len(self._cache),
+            "ttl_seconds": self.ttl,
+        }
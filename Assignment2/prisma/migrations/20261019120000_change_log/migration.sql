@@ -0,0 +1,11 @@
+-- CreateTable
+CREATE TABLE "ChangeLog" (
+    "seq" SERIAL NOT NULL,
+    "entity" TEXT NOT NULL,
+    "entity_id" INTEGER NOT NULL,
+    "op" TEXT NOT NULL,
+    "data" JSONB,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "ChangeLog_pkey" PRIMARY KEY ("seq")
+);
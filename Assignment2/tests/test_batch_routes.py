@@ -0,0 +1,54 @@
+# tests/test_batch_routes.py
+# POST /batch operation handling, run against an in-memory stand-in for the Prisma transaction.
+import asyncio
+
+import pytest
+
+pytest.importorskip("prisma.errors")    # needs the generated Prisma client
+
+from app.routes.batch_routes import BatchError, _apply
+from app.schemas.batch_schema import BatchOperation
+from conftest import Table
+
+
+class FakeTx:
+    def __init__(self):
+        self.product = Table()
+        self.company = Table()
+        self.category = Table()
+        self.changelog = Table()
+
+    async def query_raw(self, *args):
+        return [{"locked": 1}]
+
+
+def run(operations):
+    tx, refs = FakeTx(), {}
+    results = [
+        asyncio.run(_apply(tx, index, BatchOperation(**op), refs))
+        for index, op in enumerate(operations)
+    ]
+    return tx, results
+
+
+def test_literal_dollar_strings_are_not_references():
+    tx, results = run([
+        {"op": "create", "entity": "company", "ref": "acme", "data": {"name": "$Acme"}},
+        {"op": "create", "entity": "category", "ref": "cards", "data": {"name": "Cards"}},
+        {"op": "create", "entity": "product", "data": {
+            "name": "$5 Gift Card", "description": "$5 off", "price": 5, "stock": 10,
+            "company_id": "$acme", "category_id": "$cards",
+        }},
+    ])
+    product = tx.product.rows[results[2]["id"]]
+    assert product.name == "$5 Gift Card"
+    assert product.description == "$5 off"
+    assert (product.company_id, product.category_id) == (results[0]["id"], results[1]["id"])
+    assert tx.company.rows[results[0]["id"]].name == "$Acme"
+
+
+def test_unknown_reference_in_foreign_key_is_rejected():
+    with pytest.raises(BatchError, match="Unknown reference"):
+        run([{"op": "create", "entity": "product", "data": {
+            "name": "Widget", "price": 1, "stock": 1, "company_id": "$missing", "category_id": 1,
+        }}])
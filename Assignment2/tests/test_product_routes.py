@@ -0,0 +1,54 @@
+# tests/test_product_routes.py
+# Product reads against an in-memory stand-in for the Prisma client, counting the queries issued.
+import pytest
+
+pytest.importorskip("prisma.errors")    # needs the generated Prisma client
+pytest.importorskip("httpx")            # used by TestClient
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import product_routes
+from conftest import Record, Table
+
+
+class FakeDb:
+    def __init__(self, n_products: int):
+        self.queries = 0
+        self.company = Table([Record(id=i, name=f"Company {i}") for i in range(1, 6)], counter=self)
+        self.category = Table([Record(id=i, name=f"Category {i}") for i in range(1, 4)], counter=self)
+        self.product = Table([
+            Record(id=i, name=f"Product {i}", description=None, price=1.0, stock=1,
+                   company_id=i % 5 + 1, category_id=i % 3 + 1, company=None, category=None)
+            for i in range(1, n_products + 1)
+        ], counter=self)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeDb(n_products=500)
+    monkeypatch.setattr(product_routes, "prisma", db)
+    monkeypatch.setattr(product_routes, "product_reads", product_routes.SingleFlight())
+    app = FastAPI()
+    app.include_router(product_routes.router)
+    app.dependency_overrides[product_routes.get_loader] = lambda: product_routes.RelatedLoader(db)
+    return TestClient(app), db
+
+
+@pytest.mark.parametrize("limit", [1, 10, 100, 500])
+def test_include_related_query_count_does_not_grow_with_page_size(client, limit):
+    http, db = client
+    response = http.get("/products/", params={"limit": limit, "include_related": True})
+    assert response.status_code == 200
+    assert len(response.json()["products"]) == limit
+    # one query for the page, one for its companies, one for its categories
+    assert db.queries == 3
+
+
+def test_single_product_has_related_keys_only_when_requested(client):
+    http, _ = client
+    plain = http.get("/products/7").json()
+    assert "company" not in plain and "category" not in plain
+    assert plain["description"] is None
+    related = http.get("/products/7", params={"include_related": True}).json()
+    assert related["company"]["id"] == 3 and related["category"]["id"] == 2
@@ -0,0 +1,80 @@
+# category_cache.py
+# In-memory category name -> id cache used by every import path.
+# A CSV repeats the same few category names on thousands of rows, so names are resolved
+# once per distinct value: cache first, then one lookup query for the unknown slugs, then one
+# create_many for the categories that don't exist yet (never a query per row).
+# Categories are never renamed or deleted by this app, so cached ids stay valid.
+
+import re
+from typing import Iterable
+
+# Slugs per IN (...) lookup
+LOOKUP_CHUNK = 1000
+# Whitespace as the SQL backfill sees it (ASCII only, unlike str.split())
+WHITESPACE = " \t\n\r\f\v"
+WHITESPACE_RUN = re.compile(f"[{WHITESPACE}]+")
+
+
+def slugify(name: str) -> str:
+    """
+    Spelling-insensitive category key: " Home  Decor" and "home\\tdecor" -> "home-decor".
+    Must stay in sync with the expression in prisma/migrate_categories.sql.
+    """
+    return WHITESPACE_RUN.sub("-", name.strip(WHITESPACE).lower())
+
+
+class CategoryCache:
+    def __init__(self):
+        self._by_name = {}      # exact spelling seen in a file -> id
+        self._by_slug = {}      # slug -> id
+        self.names = {}         # id -> canonical name (first spelling stored)
+
+    def _remember(self, category) -> None:
+        self._by_slug[category.slug] = category.id
+        self.names[category.id] = category.name
+
+    async def _load(self, db, slugs: list) -> None:
+        for start in range(0, len(slugs), LOOKUP_CHUNK):
+            found = await db.category.find_many(where={"slug": {"in": slugs[start:start + LOOKUP_CHUNK]}})
+            for category in found:
+                self._remember(category)
+
+    async def lookup(self, db, name: str):
+        """Id of an existing category (any spelling), or None; never creates one"""
+        if name in self._by_name:
+            return self._by_name[name]
+        slug = slugify(name)
+        if slug not in self._by_slug:
+            await self._load(db, [slug])
+        return self._by_slug.get(slug)
+
+    async def resolve(self, db, names: Iterable[str]) -> dict:
+        """Return {name: category_id} for all names, creating missing categories in bulk"""
+        names = list(dict.fromkeys(names))     # de-duplicate, keep file order (first spelling wins)
+        unknown = {}    # slug -> first spelling
+        for name in names:
+            if name in self._by_name:
+                continue
+            slug = slugify(name)
+            if slug not in self._by_slug:
+                unknown.setdefault(slug, name.strip(WHITESPACE))
+        if unknown:
+            await self._load(db, list(unknown))
+            missing = [slug for slug in unknown if slug not in self._by_slug]
+            if missing:
+                # skip_duplicates: a concurrent import may create the same category first
+                await db.category.create_many(
+                    data=[{"name": unknown[slug], "slug": slug} for slug in missing],
+                    skip_duplicates=True,
+                )
+                await self._load(db, missing)
+        result = {}
+        for name in names:
+            if name not in self._by_name:
+                self._by_name[name] = self._by_slug[slugify(name)]
+            result[name] = self._by_name[name]
+        return result
+
+
+# Shared instance (process wide)
+categories = CategoryCache()
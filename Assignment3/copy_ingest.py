@@ -0,0 +1,131 @@
+# copy_ingest.py
+# Postgres COPY ingest engine.
+# Rows (with category_id already resolved) are streamed into a temporary staging table with COPY ... FROM STDIN (one round trip,
+# no per-row INSERT), then merged into "Product" with a few set-based SQL statements,
+# all inside one transaction. Used by service.ingest_rows when engine="copy".
+
+import csv
+import io
+import os
+from itertools import islice
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import psycopg2
+
+# Query parameters understood by Prisma but not by libpq
+PRISMA_ONLY_PARAMS = {"schema", "connection_limit", "pool_timeout", "pgbouncer", "statement_cache_size", "socket_timeout"}
+# Rows rendered per read() of the COPY stream
+COPY_BATCH_ROWS = 5000
+
+STAGE_COLUMNS = ("name", "price", "quantity", "category_id", "content_hash", "ord")
+# Prisma stores DateTime as UTC `timestamp(3)`; raw SQL must write the same (Prisma's @updatedAt is client side)
+NOW_UTC = "(now() AT TIME ZONE 'UTC')"
+
+
+def database_dsn() -> str:
+    """DATABASE_URL (shared with Prisma) without the Prisma-only query parameters"""
+    parts = urlsplit(os.getenv("DATABASE_URL", ""))
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in PRISMA_ONLY_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class CsvRowStream:
+    """File-like object that renders rows as CSV on demand, so COPY never needs the whole file in memory"""
+
+    def __init__(self, rows):
+        self._rows = enumerate(rows)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            batch = list(islice(self._rows, COPY_BATCH_ROWS))
+            if not batch:
+                break
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerows(
+                (r["name"], repr(float(r["price"])), int(r["quantity"]), r["category_id"], r["content_hash"], ord_)
+                for ord_, r in batch
+            )
+            self._buffer += out.getvalue().encode("utf-8")
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _ident(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def connect():
+    """Open a direct psycopg2 connection (raises psycopg2.OperationalError when unreachable)"""
+    return psycopg2.connect(database_dsn())
+
+
+def copy_rows(conn, rows, import_mode: str = "append", key_fields=("name", "category_id")) -> dict:
+    """
+    Ingest rows (dicts with name/price/quantity/category_id/content_hash) through COPY, in one
+    transaction on `conn` (closed afterwards).
+    append: insert everything. upsert: same semantics as service.upsert_products_service.
+    Blocking (psycopg2) - call it with asyncio.to_thread.
+    """
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(
+                "CREATE TEMP TABLE product_stage ("
+                " name text, price double precision, quantity integer,"
+                " category_id integer, content_hash text, ord bigint) ON COMMIT DROP"
+            )
+            cur.copy_expert(
+                f"COPY product_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                CsvRowStream(rows),
+                size=1 << 20,
+            )
+
+            if import_mode == "append":
+                cur.execute(
+                    'INSERT INTO "Product" (name, price, quantity, category_id, content_hash, updated_at) '
+                    f"SELECT name, price, quantity, category_id, content_hash, {NOW_UTC} FROM product_stage ORDER BY ord"
+                )
+                return {"inserted": cur.rowcount}
+
+            key = ", ".join(_ident(f) for f in key_fields)
+            match = " AND ".join(f"p.{_ident(f)} = s.{_ident(f)}" for f in key_fields)
+            # Last row per key wins, then pair each key with its oldest existing row (if any)
+            cur.execute(
+                "CREATE TEMP TABLE product_delta ON COMMIT DROP AS "
+                f"SELECT DISTINCT ON ({key}) * FROM product_stage ORDER BY {key}, ord DESC"
+            )
+            cur.execute(
+                "CREATE TEMP TABLE product_match ON COMMIT DROP AS "
+                "SELECT s.*, m.id AS target_id, m.content_hash AS old_hash FROM product_delta s "
+                f'LEFT JOIN LATERAL (SELECT p.id, p.content_hash FROM "Product" p WHERE {match} '
+                "ORDER BY p.id LIMIT 1) m ON true"
+            )
+            cur.execute(
+                'UPDATE "Product" p SET name = m.name, price = m.price, quantity = m.quantity, '
+                f"category_id = m.category_id, content_hash = m.content_hash, updated_at = {NOW_UTC} "
+                "FROM product_match m WHERE p.id = m.target_id AND m.old_hash IS DISTINCT FROM m.content_hash"
+            )
+            updated = cur.rowcount
+            cur.execute(
+                'INSERT INTO "Product" (name, price, quantity, category_id, content_hash, updated_at) '
+                f"SELECT name, price, quantity, category_id, content_hash, {NOW_UTC} FROM product_match "
+                "WHERE target_id IS NULL ORDER BY ord"
+            )
+            inserted = cur.rowcount
+            cur.execute(
+                "SELECT (SELECT count(*) FROM product_stage), (SELECT count(*) FROM product_delta), "
+                "(SELECT count(*) FROM product_match WHERE target_id IS NOT NULL AND old_hash = content_hash)"
+            )
+            staged, distinct, unchanged = cur.fetchone()
+            return {
+                "inserted": inserted,
+                "updated": updated,
+                "unchanged": unchanged,
+                "duplicates_in_file": staged - distinct,
+            }
+    finally:
+        conn.close()
@@ -0,0 +1,259 @@
+# csv_parser.py
+# CSV parsing helpers: row conversion plus a parallel (multi-process) parser for large uploads.
+
+import asyncio
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Worker processes used by the parallel parser (default: one per core)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+# Target size of one chunk handed to a worker
+PARSE_CHUNK_BYTES = int(os.getenv("PARSE_CHUNK_BYTES", str(8 * 1024 * 1024)))
+
+# How many row-level errors a validation report keeps (the counts are always complete)
+MAX_REPORTED_ERRORS = int(os.getenv("MAX_REPORTED_ERRORS", "100"))
+# Rows converted together in one vectorized step
+VALIDATE_BATCH_ROWS = int(os.getenv("VALIDATE_BATCH_ROWS", "100000"))
+# Product.quantity is a 32-bit Int in the Prisma schema
+INT32_MAX = 2**31 - 1
+
+FIELDS = ("name", "price", "quantity", "category")
+
+_pool = None
+
+
+def convert_row(r: dict) -> dict:
+    """Clean and convert one CSV row (raises on bad values)"""
+    return {
+        "name": r.get("name", "").strip(),
+        "price": float(r.get("price", 0) or 0),
+        "quantity": int(float(r.get("quantity", 0) or 0)),
+        "category": r.get("category", "").strip(),
+    }
+
+
+def parse_text(text: str) -> List[dict]:
+    """Parse CSV text (with header) into converted rows; stops at the first bad row"""
+    rows = []
+    for r in csv.DictReader(io.StringIO(text)):
+        try:
+            rows.append(convert_row(r))
+        except Exception as e:
+            raise ValueError(f"Invalid row in CSV: {r} -> {e}")
+    return rows
+
+
+# ---------------- Chunking ---------------- #
+def _count(data, sub: bytes, start: int, end: int) -> int:
+    # bytes.count works in place; mmap has find() but no count(), so count in a slice
+    if isinstance(data, bytes):
+        return data.count(sub, start, end)
+    return data[start:end].count(sub)
+
+
+def _record_end(data, pos: int, quotes: int) -> int:
+    """
+    Return the offset just after the first newline at/after `pos` that is NOT inside a quoted
+    field, given `quotes` = number of '"' seen since the last record boundary.
+    """
+    while True:
+        nl = data.find(b"\n", pos)
+        if nl == -1:
+            return len(data)
+        quotes += _count(data, b'"', pos, nl + 1)
+        if quotes % 2 == 0:
+            return nl + 1
+        pos = nl + 1
+
+
+def split_chunks(data, chunk_size: int = PARSE_CHUNK_BYTES) -> tuple:
+    """
+    Split CSV bytes at record boundaries.
+    Returns (header_end, [(start, end), ...]); data[:header_end] is the header line.
+    Works on bytes and on mmap objects.
+    """
+    header_end = _record_end(data, 0, 0)
+    ranges = []
+    start = header_end
+    size = len(data)
+    while start < size:
+        guess = min(start + chunk_size, size)
+        if guess >= size:
+            end = size
+        else:
+            # Quotes between the chunk start and the guess decide whether that spot is inside a field
+            end = _record_end(data, guess, _count(data, b'"', start, guess))
+        ranges.append((start, end))
+        start = end
+    return header_end, ranges
+
+
+def _parse_chunk(header: bytes, chunk: bytes) -> List[dict]:
+    # Runs in a worker process
+    return parse_text((header + chunk).decode("utf-8"))
+
+
+# ---------------- Parallel parse ---------------- #
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def parse_csv_bytes_parallel(file_bytes: bytes, executor=None, chunk_size: int = PARSE_CHUNK_BYTES) -> List[dict]:
+    """
+    Parse a large CSV upload off the event loop.
+    The file is split at line boundaries, chunks are parsed in a process pool and the
+    results are merged back in file order. Errors are reported for the first bad row in file order.
+    """
+    loop = asyncio.get_running_loop()
+    header_end, ranges = split_chunks(file_bytes, chunk_size)
+    if len(ranges) <= 1:
+        # Small file: not worth the inter-process copy, but still keep it off the event loop
+        return await loop.run_in_executor(None, parse_text, file_bytes.decode("utf-8"))
+
+    executor = executor or get_pool()
+    header = file_bytes[:header_end]
+    futures = [
+        loop.run_in_executor(executor, _parse_chunk, header, file_bytes[start:end])
+        for start, end in ranges
+    ]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    rows = []
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+        rows.extend(result)
+    return rows
+
+
+# ---------------- Validation report ---------------- #
+class ValidationReport:
+    """Counts every row and keeps the first `max_errors` row-level errors (with line numbers)"""
+
+    def __init__(self, max_errors: int = MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.total_rows = 0
+        self.invalid_rows = 0
+        self.errors = []
+
+    def add_error(self, line: int, column, value, message: str) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "column": column, "value": value, "message": message})
+
+    def merge(self, total_rows: int, invalid_rows: int, errors: list, line_offset: int = 0) -> None:
+        """Add the counts and errors of a report built for one chunk of the file"""
+        self.total_rows += total_rows
+        self.invalid_rows += invalid_rows
+        for error in errors:
+            self.add_error(error["line"] + line_offset, error["column"], error["value"], error["message"])
+
+    def as_dict(self) -> dict:
+        return {
+            "total_rows": self.total_rows,
+            "valid_rows": self.total_rows - self.invalid_rows,
+            "invalid_rows": self.invalid_rows,
+            "errors": self.errors,
+            "errors_truncated": self.invalid_rows > len(self.errors),
+        }
+
+
+def _to_number(values: list) -> tuple:
+    """Vectorized str -> float; empty means 0 (like convert_row). Returns (numbers, bad mask)"""
+    series = pd.Series(values, dtype="object").str.strip()
+    numbers = pd.to_numeric(series.mask(series == "", "0"), errors="coerce").to_numpy(dtype="float64")
+    return numbers, ~np.isfinite(numbers)
+
+
+def _validate_batch(records: list, lines: list, index: dict, width: int, report: ValidationReport) -> List[dict]:
+    bad = np.zeros(len(records), dtype=bool)
+    problems = []   # (line, column, value, message), sorted before reporting
+
+    # Pull out the 4 columns (missing columns behave like convert_row's defaults)
+    columns = {field: [] for field in FIELDS}
+    for i, record in enumerate(records):
+        if len(record) != width:
+            bad[i] = True
+            problems.append((lines[i], None, None, f"expected {width} fields, got {len(record)}"))
+            record = [""] * width
+        for field in FIELDS:
+            pos = index.get(field)
+            columns[field].append(record[pos] if pos is not None else "")
+
+    prices, bad_price = _to_number(columns["price"])
+    quantities, bad_quantity = _to_number(columns["quantity"])
+    bad_quantity |= np.abs(np.nan_to_num(quantities)) > INT32_MAX
+
+    for field, mask in (("price", bad_price & ~bad), ("quantity", bad_quantity & ~bad)):
+        for i in np.flatnonzero(mask):
+            problems.append((lines[i], field, columns[field][i], f"invalid {field}"))
+    bad |= bad_price | bad_quantity
+
+    problems.sort(key=lambda p: p[0])
+    for problem in problems:
+        report.add_error(*problem)
+    report.total_rows += len(records)
+    report.invalid_rows += int(bad.sum())
+
+    quantities = np.trunc(np.nan_to_num(quantities)).astype(np.int64)
+    return [
+        {
+            "name": columns["name"][i].strip(),
+            "price": float(prices[i]),
+            "quantity": int(quantities[i]),
+            "category": columns["category"][i].strip(),
+        }
+        for i in np.flatnonzero(~bad)
+    ]
+
+
+def validate_csv(text_stream, report: ValidationReport, batch_rows: int = VALIDATE_BATCH_ROWS):
+    """
+    Validate a whole CSV text stream instead of stopping at the first bad row.
+    Yields lists of valid, converted rows (one list per batch) and records every invalid
+    row in `report`. price/quantity are converted per batch with pandas (vectorized).
+    """
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    # Same rule as csv.DictReader: the last column with a given name wins
+    index = {name: pos for pos, name in enumerate(header)}
+    width = len(header)
+
+    records, lines = [], []
+    previous_line = reader.line_num
+    for record in reader:
+        # A quoted field can span lines: report the line where the record starts
+        start_line, previous_line = previous_line + 1, reader.line_num
+        if not record:
+            continue   # DictReader skips blank lines too
+        records.append(record)
+        lines.append(start_line)
+        if len(records) >= batch_rows:
+            yield _validate_batch(records, lines, index, width, report)
+            records, lines = [], []
+    if records:
+        yield _validate_batch(records, lines, index, width, report)
+
+
+def validate_csv_bytes(file_bytes: bytes, report: ValidationReport) -> List[dict]:
+    """validate_csv over an in-memory upload; returns all valid rows"""
+    rows = []
+    for batch in validate_csv(io.StringIO(file_bytes.decode("utf-8"), newline=""), report):
+        rows.extend(batch)
+    return rows
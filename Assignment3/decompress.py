@@ -0,0 +1,61 @@
+# decompress.py
+# Compressed CSV uploads (.csv.gz, .csv.zst, single-entry .zip).
+# The upload is decompressed incrementally while the CSV reader pulls text from it, so the
+# decompressed file is never held in memory; only the current validation batch is.
+# .csv.zst needs the `zstandard` package (in requirements.txt).
+
+import gzip
+import io
+import zipfile
+import zlib
+
+# file name suffix -> upload kind
+UPLOAD_KINDS = (
+    (".csv.gz", "gz"),
+    (".csv.zst", "zst"),
+    (".zip", "zip"),
+    (".csv", "csv"),
+)
+
+# Errors that mean "the archive is broken", raised lazily while reading
+CORRUPT_ERRORS = (OSError, EOFError, zlib.error, zipfile.BadZipFile, UnicodeDecodeError, ValueError)
+try:
+    import zstandard
+
+    CORRUPT_ERRORS += (zstandard.ZstdError,)
+except ImportError:
+    zstandard = None
+
+
+def upload_kind(filename: str):
+    """'csv', 'gz', 'zst' or 'zip' from the file name; None when not supported"""
+    name = (filename or "").lower()
+    for suffix, kind in UPLOAD_KINDS:
+        if name.endswith(suffix):
+            return kind
+    return None
+
+
+def open_text_stream(fileobj, kind: str) -> io.TextIOWrapper:
+    """
+    Wrap the (seekable) upload in a streaming decompressor and return a text stream
+    for csv.reader; the upload file itself is left open. Raises ValueError for archives
+    this app does not accept.
+    """
+    fileobj.seek(0)
+    if kind == "gz":
+        raw = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    elif kind == "zst":
+        if zstandard is None:
+            raise ValueError(".csv.zst uploads need the zstandard package on the server")
+        # closefd=False: the upload is read twice in all_or_nothing mode
+        raw = zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True, closefd=False)
+    elif kind == "zip":
+        archive = zipfile.ZipFile(fileobj)
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+        if len(entries) != 1 or not entries[0].filename.lower().endswith(".csv"):
+            raise ValueError("A .zip upload must contain exactly one .csv file")
+        raw = archive.open(entries[0])
+    else:
+        raise ValueError(f"not a compressed upload: {kind}")
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
@@ -0,0 +1,154 @@
+# export_cache.py
+# On-disk cache of full exports, keyed by a data version.
+#
+# - Version = max(Product.updated_at) + max(Product.id) + this process's write counter + a
+#   per-process nonce. updated_at moves on every insert/update, also those made by other processes;
+#   the counter covers writes within the same millisecond, and the nonce keeps a restarted
+#   process from trusting files written by an older one.
+# - A file is written to a unique temp file (mkstemp) and renamed into place with os.replace,
+#   so readers only ever see complete files.
+# - Concurrent requests for the same file share one generation task (single-flight).
+# - Old files are evicted (least recently used first) once the directory exceeds the byte budget.
+#   A file handed out in the last EXPORT_CACHE_EVICT_GRACE_SECONDS is never evicted: FileResponse
+#   opens it by path only when the response starts, and other worker processes share the directory.
+
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join("exports", "cache"))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Recently served files are kept for this long even when the cache is over budget
+EXPORT_CACHE_EVICT_GRACE_SECONDS = float(os.getenv("EXPORT_CACHE_EVICT_GRACE_SECONDS", "60"))
+
+PROCESS_NONCE = uuid.uuid4().hex[:8]
+TEMP_PREFIX = ".tmp-"
+
+
+class ExportCache:
+    def __init__(
+        self,
+        directory: str = EXPORT_CACHE_DIR,
+        max_bytes: int = EXPORT_CACHE_MAX_BYTES,
+        grace_seconds: float = EXPORT_CACHE_EVICT_GRACE_SECONDS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.writes = 0
+        self._tasks = {}        # file name -> generation task
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0         # requests that joined a running generation
+        self.evictions = 0
+
+    def note_write(self) -> None:
+        """Call after every write to Product: the next export gets a new version"""
+        self.writes += 1
+
+    def version(self, max_updated_ms: int, max_id: int) -> str:
+        return f"{max_updated_ms}-{max_id}-{self.writes}-{PROCESS_NONCE}"
+
+    async def get(self, name: str, produce) -> str:
+        """
+        Path of cached file `name`, generating it first when needed.
+        `produce` is a zero-argument function returning an async iterator of bytes.
+        """
+        path = os.path.join(self.directory, name)
+        task = self._tasks.get(name)
+        if task is not None:
+            self.shared += 1
+        elif self._touch(path):
+            self.hits += 1
+            return path
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._generate(name, path, produce))
+            self._tasks[name] = task
+            task.add_done_callback(lambda t: self._tasks.pop(name) if self._tasks.get(name) is t else None)
+        # shield: a client disconnecting must not cancel a generation others are waiting on
+        return await asyncio.shield(task)
+
+    async def _generate(self, name: str, path: str, produce) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in produce():
+                    await asyncio.to_thread(f.write, chunk)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        self.evict(keep=name)
+        return path
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        # Mark as recently used, which also protects it from eviction for the grace period
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _entries(self) -> list:
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if name.startswith(TEMP_PREFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def evict(self, keep: str = None) -> None:
+        """
+        Delete least recently used files until the cache fits in max_bytes
+        (never `keep`, and never a file used within the grace period).
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        recent = time.time() - self.grace_seconds
+        for mtime, size, name in entries:
+            if total <= self.max_bytes or mtime >= recent:
+                # sorted by mtime: every file after this one was used even more recently
+                break
+            if name == keep or name in self._tasks:
+                continue
+            try:
+                # A response already streaming this file keeps its open handle (POSIX)
+                os.unlink(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "writes": self.writes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "evictions": self.evictions,
+            "generating": len(self._tasks),
+        }
+
+
+# Shared instance used by the router and service
+export_cache = ExportCache()
@@ -0,0 +1,168 @@
+# exporter.py
+# Streaming export encoders for /download-csv.
+# Products are read in keyset batches (service.iter_product_batches) and every batch is
+# encoded and sent right away, so a full export never sits in memory as one big string.
+#
+# Formats:  csv | csv.gz | csv.zst | ndjson | parquet | arrow (Arrow IPC stream)
+# csv.zst needs the `zstandard` package, parquet/arrow need `pyarrow` (both in requirements.txt;
+# a server installed without them answers 406 for those formats).
+
+import csv
+import io
+import json
+import zlib
+
+from fastapi import HTTPException
+
+EXPORT_FIELDS = ["id", "name", "price", "quantity", "category"]
+
+# format -> (media type, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+    "csv.zst": ("application/zstd", "csv.zst"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+# Extra Accept values understood during negotiation
+ACCEPT_ALIASES = {
+    "*/*": "csv",
+    "text/*": "csv",
+    "application/json": "ndjson",
+    "application/x-parquet": "parquet",
+    "application/vnd.apache.arrow.file": "arrow",
+}
+MEDIA_TO_FORMAT = {media: fmt for fmt, (media, _) in FORMATS.items()}
+
+
+def negotiate(fmt, accept) -> str:
+    """Pick the export format: explicit ?format= wins, then the Accept header (by q), else csv"""
+    if fmt:
+        return fmt
+    if not accept:
+        return "csv"
+    offers = []
+    for position, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            offers.append((-q, position, media.lower()))
+    for _, _, media in sorted(offers):
+        found = MEDIA_TO_FORMAT.get(media) or ACCEPT_ALIASES.get(media)
+        if found:
+            return found
+    raise HTTPException(status_code=406, detail=f"Supported formats: {', '.join(FORMATS)}")
+
+
+def check_available(fmt: str) -> None:
+    """Fail before streaming starts when an optional dependency is missing"""
+    try:
+        if fmt == "csv.zst":
+            import zstandard  # noqa: F401
+        elif fmt in ("parquet", "arrow"):
+            import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise HTTPException(status_code=406, detail=f"format {fmt} is not available on this server ({e.name} not installed)")
+
+
+def _row(p) -> list:
+    # p.category is the included Category relation
+    return [p.id, p.name, p.price, p.quantity, p.category.name]
+
+
+# ---------------- Text formats ---------------- #
+async def _csv_chunks(batches):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_FIELDS)
+    async for batch in batches:
+        writer.writerows(_row(p) for p in batch)
+        yield out.getvalue().encode("utf-8")
+        out.seek(0)
+        out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+async def _ndjson_chunks(batches):
+    async for batch in batches:
+        lines = [json.dumps(dict(zip(EXPORT_FIELDS, _row(p))), ensure_ascii=False) for p in batch]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def _compressed(chunks, compressor):
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ---------------- Columnar formats ---------------- #
+class _Drain(io.RawIOBase):
+    """Write-only sink: pyarrow writes into it, we hand out what was written since the last drain"""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+async def _columnar_chunks(batches, fmt: str):
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("id", pa.int32()),
+        ("name", pa.string()),
+        ("price", pa.float64()),
+        ("quantity", pa.int32()),
+        ("category", pa.string()),
+    ])
+    sink = _Drain()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    async for batch in batches:
+        columns = list(zip(*(_row(p) for p in batch)))
+        record_batch = pa.RecordBatch.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema)
+        writer.write_batch(record_batch)   # parquet: one row group per batch
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def encode(batches, fmt: str):
+    """Async iterator of encoded bytes for an async iterator of product batches"""
+    if fmt == "csv":
+        return _csv_chunks(batches)
+    if fmt == "csv.gz":
+        # wbits=31 -> gzip container
+        return _compressed(_csv_chunks(batches), zlib.compressobj(6, zlib.DEFLATED, 31))
+    if fmt == "csv.zst":
+        import zstandard
+
+        return _compressed(_csv_chunks(batches), zstandard.ZstdCompressor(level=3).compressobj())
+    if fmt == "ndjson":
+        return _ndjson_chunks(batches)
+    return _columnar_chunks(batches, fmt)
@@ -0,0 +1,159 @@
+# file_import.py
+# Server-side CSV import from a file that is already on this host (or a mounted volume).
+#
+# Instead of pushing the file through multipart /upload-csv (HTTP body copy + whole file in
+# memory), the file is memory-mapped, split at record boundaries (csv_parser.split_chunks)
+# and each worker process maps the same file and validates its own byte range. Only
+# (path, offsets) go to the workers; chunks are ingested in file order as soon as they are ready.
+#
+# Used by POST /admin/import-file (paths confined to IMPORT_ALLOWED_DIR) and as a CLI:
+#     python file_import.py /data/catalog.csv --import-mode upsert --engine copy
+# The CLI runs with the operator's own file permissions, so it accepts any path.
+
+import argparse
+import asyncio
+import itertools
+import json
+import mmap
+import os
+from collections import deque
+
+from csv_parser import PARSE_CHUNK_BYTES, PARSE_WORKERS, ValidationReport, get_pool, split_chunks, validate_csv
+from service import (
+    DEFAULT_IMPORT_KEY,
+    INGEST_ENGINE,
+    KEY_FIELDS,
+    SUMMARY_COUNTS,
+    connect_db,
+    disconnect_db,
+    ingest_rows,
+    merge_summary,
+)
+
+# Server-side import is disabled unless this directory is configured
+IMPORT_ALLOWED_DIR = os.getenv("IMPORT_ALLOWED_DIR")
+
+
+def resolve_import_path(path: str, allowed_dir: str = IMPORT_ALLOWED_DIR) -> str:
+    """
+    Real path of `path` (relative paths are taken relative to the allowed directory).
+    Raises PermissionError when it resolves outside allowed_dir (symlinks and ".." included).
+    """
+    if not allowed_dir:
+        raise PermissionError("server-side import is disabled (IMPORT_ALLOWED_DIR is not set)")
+    root = os.path.realpath(allowed_dir)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise PermissionError("path is outside the allowed import directory")
+    if not os.path.isfile(full):
+        raise FileNotFoundError(f"no such file: {path}")
+    return full
+
+
+def _validate_range(path: str, header_end: int, start: int, end: int, max_errors: int) -> tuple:
+    # Runs in a worker process: map the file and validate bytes [start, end) with the header.
+    # The range is decoded straight from the mapping through a memoryview (the bytes -> str
+    # decode is the only full copy), and the header is fed to the reader as its own line
+    # instead of being concatenated in front of the chunk.
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # The view must be released before the mmap closes
+        with memoryview(data) as view:
+            header = str(view[:header_end], "utf-8")
+            text = str(view[start:end], "utf-8")
+    report = ValidationReport(max_errors)
+    rows = []
+    for batch in validate_csv(itertools.chain((header,), _iter_lines(text)), report):
+        rows.extend(batch)
+    # "\n" is one byte in UTF-8, so counting in the text gives the byte range's line count
+    return rows, report.total_rows, report.invalid_rows, report.errors, text.count("\n")
+
+
+def _iter_lines(text: str):
+    """
+    Lines of `text`, each with its "\n" (like iterating StringIO(text, newline="") for \n and
+    \r\n files), sliced one at a time. StringIO would first copy the whole text into its own
+    4-bytes-per-character buffer.
+    """
+    pos = 0
+    size = len(text)
+    while pos < size:
+        nl = text.find("\n", pos)
+        end = size if nl == -1 else nl + 1
+        yield text[pos:end]
+        pos = end
+
+
+async def import_file(
+    path: str,
+    import_mode: str = "append",
+    key_fields=DEFAULT_IMPORT_KEY,
+    engine: str = INGEST_ENGINE,
+    dry_run: bool = False,
+    executor=None,
+    chunk_size: int = PARSE_CHUNK_BYTES,
+) -> dict:
+    """
+    Validate and ingest a local CSV chunk by chunk (invalid rows are skipped and reported).
+    Each chunk is written as its own batch, so the import is not atomic; re-running it with
+    import_mode="upsert" is idempotent.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_pool()
+    if os.path.getsize(path) == 0:
+        ranges = []
+    else:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end, ranges = split_chunks(data, chunk_size)
+
+    report = ValidationReport()
+    summary = {name: 0 for name in SUMMARY_COUNTS}
+    summary["engine"] = engine
+    pending = deque()
+    todo = iter(ranges)
+
+    def submit() -> None:
+        span = next(todo, None)
+        if span is not None:
+            pending.append(loop.run_in_executor(
+                executor, _validate_range, path, header_end, span[0], span[1], report.max_errors,
+            ))
+
+    # Keep a couple of chunks per worker in flight; the rest wait, so memory stays bounded
+    for _ in range(2 * PARSE_WORKERS):
+        submit()
+    lines_before = 0
+    while pending:
+        rows, total_rows, invalid_rows, errors, newlines = await pending.popleft()
+        submit()
+        report.merge(total_rows, invalid_rows, errors, line_offset=lines_before)
+        lines_before += newlines
+        if rows and not dry_run:
+            merge_summary(summary, await ingest_rows(rows, import_mode, key_fields, engine))
+
+    return {**summary, "dry_run": dry_run, "chunks": len(ranges), "report": report.as_dict()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a local CSV file into the Product table")
+    parser.add_argument("path")
+    parser.add_argument("--import-mode", choices=("append", "upsert"), default="append")
+    parser.add_argument("--key", default=",".join(DEFAULT_IMPORT_KEY), help="natural key for --import-mode upsert")
+    parser.add_argument("--engine", choices=("prisma", "copy"), default=INGEST_ENGINE)
+    parser.add_argument("--dry-run", action="store_true", help="only validate and report")
+    args = parser.parse_args()
+    key_fields = tuple(f.strip() for f in args.key.split(",") if f.strip())
+    if not key_fields or any(f not in KEY_FIELDS for f in key_fields):
+        parser.error(f"--key must be a comma separated subset of {', '.join(KEY_FIELDS)}")
+
+    async def run() -> dict:
+        await connect_db()
+        try:
+            return await import_file(os.path.realpath(args.path), args.import_mode, key_fields, args.engine, args.dry_run)
+        finally:
+            await disconnect_db()
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
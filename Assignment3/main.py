@@ -5,6 +5,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from router import router
 from service import connect_db, disconnect_db
+from profiler import install_profiler
+from pm_common.concurrency import install_concurrency_limiter   # shared: common/ at the repo root
+from export_cache import export_cache
 
 app = FastAPI(title="Product Management (CSV Import/Export)")
 
@@ -16,6 +19,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Optional sampling profiler (PROFILE_ENABLED=1); no-op when disabled
+install_profiler(app)
+
+# Per-route concurrency limit + bounded queue; sheds load with 503 when full
+concurrency = install_concurrency_limiter(app)
+
 # Connect/Disconnect DB automatically
 @app.on_event("startup")
 async def startup():
@@ -28,6 +37,11 @@ async def shutdown():
 # Register router
 app.include_router(router)
 
+# Queue depth / rejection counters of the concurrency limiter, export cache usage
+@app.get("/metrics")
+async def metrics():
+    return {"concurrency": concurrency.metrics(), "export_cache": export_cache.stats()}
+
 # Run using:  uvicorn main:app --reload
 
 
@@ -1,10 +1,18 @@
 # model.py
 # This file defines the Pydantic models for input validation.
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class ProductIn(BaseModel):
     name: str
     price: float
     quantity: int
     category: str
+
+
+class FileImportIn(BaseModel):
+    path: str                   # relative to (or inside) IMPORT_ALLOWED_DIR
+    import_mode: str = Field("append", pattern="^(append|upsert)$")
+    key: str = "name,category"
+    engine: str | None = Field(None, pattern="^(prisma|copy)$")
+    dry_run: bool = False
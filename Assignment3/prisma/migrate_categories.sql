@@ -0,0 +1,46 @@
+-- prisma/migrate_categories.sql
+-- One-off data migration for databases created before the Category table existed:
+-- moves the free-text Product.category column into Category + Product.category_id.
+--
+-- Run it once BEFORE `prisma db push` (which then adds the foreign key and indexes):
+--   psql "<DATABASE_URL without ?schema=...>" -f prisma/migrate_categories.sql
+--   prisma db push
+--
+-- The slug expression must match category_cache.slugify: trim ASCII whitespace (space, tab,
+-- newline, CR, FF, VT), lower case, whitespace runs -> "-".
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS "Category" (
+    "id"   SERIAL PRIMARY KEY,
+    "name" TEXT NOT NULL,
+    "slug" TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS "Category_slug_key" ON "Category" ("slug");
+
+-- One category per slug, named after the spelling used by the oldest product
+INSERT INTO "Category" ("name", "slug")
+SELECT DISTINCT ON (slug) name, slug
+FROM (
+    SELECT regexp_replace("category", '^[ \t\n\r\f\v]+|[ \t\n\r\f\v]+$', '', 'g') AS name,
+           regexp_replace(lower(regexp_replace("category", '^[ \t\n\r\f\v]+|[ \t\n\r\f\v]+$', '', 'g')), '[ \t\n\r\f\v]+', '-', 'g') AS slug,
+           "id"
+    FROM "Product"
+) AS spellings
+ORDER BY slug, "id"
+ON CONFLICT ("slug") DO NOTHING;
+
+ALTER TABLE "Product" ADD COLUMN IF NOT EXISTS "category_id" INTEGER;
+-- Normally added by `prisma db push`, which runs after this script
+ALTER TABLE "Product" ADD COLUMN IF NOT EXISTS "content_hash" TEXT;
+
+-- content_hash covered the category name; clear it so the next upsert import re-hashes
+UPDATE "Product" AS p
+SET "category_id" = c."id", "content_hash" = NULL
+FROM "Category" AS c
+WHERE c."slug" = regexp_replace(lower(regexp_replace(p."category", '^[ \t\n\r\f\v]+|[ \t\n\r\f\v]+$', '', 'g')), '[ \t\n\r\f\v]+', '-', 'g');
+
+ALTER TABLE "Product" ALTER COLUMN "category_id" SET NOT NULL;
+ALTER TABLE "Product" DROP COLUMN "category";
+
+COMMIT;
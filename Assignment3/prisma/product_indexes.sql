@@ -0,0 +1,16 @@
+-- prisma/product_indexes.sql
+-- Indexes schema.prisma can't declare (operator classes on a btree index).
+--
+-- Run it AFTER every `prisma db push` (db push drops indexes it doesn't know about):
+--   prisma db push
+--   psql "<DATABASE_URL without ?schema=...>" -f prisma/product_indexes.sql
+--
+-- CONCURRENTLY builds the index without blocking writes on "Product", so there is no
+-- BEGIN/COMMIT here (it can't run inside a transaction). IF NOT EXISTS makes re-runs a no-op.
+-- If a build is interrupted, Postgres keeps an INVALID index under that name (and IF NOT EXISTS
+-- then skips it); drop it and run this file again:
+--   DROP INDEX CONCURRENTLY IF EXISTS "Product_name_pattern_idx";
+
+-- name LIKE 'prefix%' (GET /products?name_prefix=) can't use a plain btree index under
+-- a non-C collation; text_pattern_ops compares byte-wise, so the prefix becomes a range scan
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Product_name_pattern_idx" ON "Product" ("name" text_pattern_ops);
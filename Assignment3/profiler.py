@@ -0,0 +1,17 @@
+# profiler.py
+# Optional sampling request profiler (PROFILE_ENABLED=1).
+# The implementation is shared by all three apps: pm_common.profiler (common/ at the repo root,
+# installed through requirements.txt). It is only imported when profiling is enabled.
+
+import os
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+
+if PROFILE_ENABLED:
+    from pm_common.profiler import install_profiler
+else:
+    def install_profiler(app) -> None:
+        # Profiling off: nothing is installed
+        pass
+
+__all__ = ["install_profiler"]
@@ -1,58 +1,271 @@
 # router.py
 # This file defines all API routes and uses service functions.
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
-from model import ProductIn
-from service import add_product_service, bulk_insert_service, fetch_all_products, parse_csv_bytes
-import csv
-import io
-import os
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from model import FileImportIn, ProductIn
+from service import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    INGEST_ENGINE,
+    KEY_FIELDS,
+    add_product_service,
+    bulk_insert_service,
+    copy_ingest_service,
+    export_version,
+    export_watermark,
+    iter_changed_batches,
+    ingest_rows,
+    iter_product_batches,
+    list_products_service,
+    merge_summary,
+    parse_csv_bytes,
+    upsert_products_service,
+)
+from csv_parser import ValidationReport, parse_csv_bytes_parallel, validate_csv, validate_csv_bytes
+from decompress import CORRUPT_ERRORS, open_text_stream, upload_kind
+from exporter import FORMATS, check_available, encode, negotiate
+from export_cache import export_cache
+from category_cache import categories
+from file_import import import_file, resolve_import_path
+from datetime import datetime, timezone
+import asyncio
 
 router = APIRouter()
 
+
+def _product_out(p, category: str) -> dict:
+    # Response shape of a product everywhere: flat, category by name, no internal columns
+    # (category_id, content_hash, updated_at stay in the database)
+    return {"id": p.id, "name": p.name, "price": p.price, "quantity": p.quantity, "category": category}
+
+
 # 1️⃣ Add product manually via JSON
 @router.post("/add-product", status_code=201)
 async def add_product(payload: ProductIn):
     created = await add_product_service(payload.dict())
-    return created
+    return _product_out(created, created.category.name)
 
 
 # 2️⃣ Upload CSV and bulk insert
 @router.post("/upload-csv")
-async def upload_csv(file: UploadFile = File(...)):
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Please upload a .csv file")
+async def upload_csv(
+    file: UploadFile = File(...),
+    parallel: bool = Query(False, description="Parse in a process pool (large files)"),
+    mode: str | None = Query(
+        None,
+        pattern="^(skip_invalid|all_or_nothing)$",
+        description="Validate the whole file and return a report: insert valid rows and skip bad ones, "
+                    "or insert nothing if any row is bad",
+    ),
+    dry_run: bool = Query(False, description="Only validate and report, insert nothing"),
+    import_mode: str = Query(
+        "append",
+        pattern="^(append|upsert)$",
+        description="append: insert every row; upsert: insert new keys, update changed rows, skip unchanged",
+    ),
+    key: str = Query("name,category", description="Natural key columns for import_mode=upsert"),
+    engine: str = Query(
+        INGEST_ENGINE,
+        pattern="^(prisma|copy)$",
+        description="copy: Postgres COPY into a staging table + set-based merge (falls back to prisma if unavailable)",
+    ),
+):
+    kind = upload_kind(file.filename)
+    if kind is None:
+        raise HTTPException(status_code=400, detail="Please upload a .csv, .csv.gz, .csv.zst or .zip file")
+    key_fields = _parse_key(key)
+    if kind != "csv":
+        # Compressed uploads always go through the streaming validation path
+        return await _upload_compressed(file.file, kind, mode or "all_or_nothing", dry_run, import_mode, key_fields, engine)
     content = await file.read()
+    if mode or dry_run:
+        return await _upload_with_report(content, mode or "all_or_nothing", dry_run, import_mode, key_fields, engine)
     try:
-        rows = parse_csv_bytes(content)
+        if parallel:
+            rows = await parse_csv_bytes_parallel(content)
+        else:
+            rows = parse_csv_bytes(content)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if engine == "copy":
+        summary = await copy_ingest_service(rows, import_mode, key_fields)
+        if summary is not None:
+            return summary
+    if import_mode == "upsert":
+        return await upsert_products_service(rows, key_fields)
+    created = await bulk_insert_service(rows)
+    # The import just resolved these categories, so their names are in the cache
+    details = [_product_out(p, categories.names[p.category_id]) for p in created]
+    return {"inserted": len(created), "details": details}
+
+
+def _parse_key(key: str) -> tuple:
+    fields = tuple(f.strip() for f in key.split(",") if f.strip())
+    if not fields or any(f not in KEY_FIELDS for f in fields):
+        raise HTTPException(status_code=400, detail=f"key must be a comma separated subset of {', '.join(KEY_FIELDS)}")
+    return fields
+
+
+# Validation-report flavour of /upload-csv: every bad row is reported (up to a cap)
+async def _upload_with_report(content: bytes, mode: str, dry_run: bool, import_mode: str, key_fields: tuple, engine: str):
+    report = ValidationReport()
+    # CPU-bound: keep it off the event loop
+    try:
+        rows = await asyncio.to_thread(validate_csv_bytes, content, report)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"File is not valid UTF-8: {e}")
+    if dry_run:
+        return {"inserted": 0, "dry_run": True, "report": report.as_dict()}
+    if mode == "all_or_nothing" and report.invalid_rows:
+        raise HTTPException(status_code=400, detail={"message": "CSV has invalid rows", "report": report.as_dict()})
+    if engine == "copy":
+        summary = await copy_ingest_service(rows, import_mode, key_fields)
+        if summary is not None:
+            return {**summary, "dry_run": False, "report": report.as_dict()}
+    if import_mode == "upsert":
+        summary = await upsert_products_service(rows, key_fields)
+        return {**summary, "dry_run": False, "report": report.as_dict()}
     created = await bulk_insert_service(rows)
-    return {"inserted": len(created), "details": created}
+    return {"inserted": len(created), "dry_run": False, "report": report.as_dict()}
+
+
+# Compressed flavour: the upload is decompressed and validated batch by batch and each valid
+# batch is ingested right away, so the decompressed file is never held in memory.
+# In skip_invalid mode an archive that turns out to be corrupt halfway through still answers 400,
+# with the counts of what was already written ("partial": true).
+async def _upload_compressed(fileobj, kind: str, mode: str, dry_run: bool, import_mode: str, key_fields: tuple, engine: str):
+    if mode == "all_or_nothing" or dry_run:
+        # Validation-only first pass: nothing is written if a bad row shows up late in the file
+        report = ValidationReport()
+        await _read_upload(_validate_only, fileobj, kind, report)
+        if dry_run:
+            return {"inserted": 0, "dry_run": True, "report": report.as_dict()}
+        if report.invalid_rows:
+            raise HTTPException(status_code=400, detail={"message": "CSV has invalid rows", "report": report.as_dict()})
+
+    report = ValidationReport()
+    batches = validate_csv(await _read_upload(open_text_stream, fileobj, kind), report)
+    summary = {"inserted": 0, "engine": engine}
+    written = False
+    while True:
+        try:
+            batch = await asyncio.to_thread(next, batches, None)
+        except CORRUPT_ERRORS as e:
+            if not written:
+                raise HTTPException(status_code=400, detail=f"Could not read the upload: {e}")
+            # skip_invalid: earlier batches are already committed, so say what was written
+            raise HTTPException(status_code=400, detail={
+                "message": f"Could not read the upload: {e}",
+                "partial": True,
+                **summary,
+                "report": report.as_dict(),
+            })
+        if batch is None:
+            break
+        if batch:
+            merge_summary(summary, await ingest_rows(batch, import_mode, key_fields, engine))
+            written = True
+    return {**summary, "dry_run": False, "report": report.as_dict()}
+
+
+def _validate_only(fileobj, kind: str, report: ValidationReport) -> None:
+    for _ in validate_csv(open_text_stream(fileobj, kind), report):
+        pass
 
 
-# 3️⃣ Download all products as CSV
+async def _read_upload(fn, *args):
+    # Decompression + validation is blocking CPU work: run it in a thread, map broken archives to 400
+    try:
+        return await asyncio.to_thread(fn, *args)
+    except CORRUPT_ERRORS as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the upload: {e}")
+
+
+# Admin: import a CSV that already sits on the server (under IMPORT_ALLOWED_DIR)
+@router.post("/admin/import-file")
+async def import_server_file(payload: FileImportIn):
+    key_fields = _parse_key(payload.key)
+    try:
+        path = resolve_import_path(payload.path)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        return await import_file(path, payload.import_mode, key_fields, payload.engine or INGEST_ENGINE, payload.dry_run)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"File is not valid UTF-8: {e}")
+
+
+def _format_watermark(watermark: datetime) -> str:
+    # "Z" instead of "+00:00": a "+" pasted into ?since= unencoded would be read as a space
+    return watermark.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# 3️⃣ Download all products (CSV by default, or a compressed / columnar format).
+# Every response carries X-Export-Watermark; pass it back as ?since= to get only the rows
+# created or changed after it.
 @router.get("/download-csv")
-async def download_csv():
-    products = await fetch_all_products()
-    output = io.StringIO()
-    fieldnames = ["id", "name", "price", "quantity", "category"]
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    for p in products:
-        writer.writerow({
-            "id": p.id,
-            "name": p.name,
-            "price": p.price,
-            "quantity": p.quantity,
-            "category": p.category
-        })
-
-    exports_dir = "exports"
-    os.makedirs(exports_dir, exist_ok=True)
-    file_path = os.path.join(exports_dir, "products_export.csv")
-    with open(file_path, "w", encoding="utf-8", newline="") as f:
-        f.write(output.getvalue())
-
-    return FileResponse(path=file_path, filename="products_export.csv", media_type="text/csv")
+async def download_csv(
+    format: str | None = Query(
+        None,
+        pattern=r"^(csv|csv\.gz|csv\.zst|ndjson|parquet|arrow)$",
+        description="Export format; when omitted it is picked from the Accept header (default csv)",
+    ),
+    since: datetime | None = Query(None, description="Watermark from a previous export: only rows changed after it"),
+    cached: bool = Query(True, description="Serve from the versioned export cache (false: stream a fresh export)"),
+    accept: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
+    fmt = negotiate(format, accept)
+    check_available(fmt)
+    media_type, extension = FORMATS[fmt]
+    # Taken before any row is read, so the next delta can't miss rows written during this export
+    watermark = await export_watermark()
+    headers = {"Vary": "Accept"}
+
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Never move a consumer's watermark backwards
+        watermark = max(watermark, since)
+        headers["X-Export-Watermark"] = _format_watermark(watermark)
+        headers["Content-Disposition"] = f'attachment; filename="products_changes.{extension}"'
+        return StreamingResponse(encode(iter_changed_batches(since, watermark), fmt), media_type=media_type, headers=headers)
+
+    headers["X-Export-Watermark"] = _format_watermark(watermark)
+    filename = f"products_export.{extension}"
+    if not cached:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return StreamingResponse(encode(iter_product_batches(), fmt), media_type=media_type, headers=headers)
+
+    version = await export_version()
+    headers["ETag"] = f'"{version}-{fmt}"'
+    if if_none_match and headers["ETag"] in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    path = await export_cache.get(
+        f"products_{version}.{extension}",
+        lambda: encode(iter_product_batches(), fmt),
+    )
+    return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
+
+
+# 4️⃣ List products with filters (cursor pagination)
+@router.get("/products")
+async def list_products(
+    category: str | None = Query(None, description="Category name (any spelling of it)"),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_quantity: int | None = Query(None),
+    name_prefix: str | None = Query(None, min_length=1, description="Products whose name starts with this"),
+    cursor: int | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price must not be greater than max_price")
+    rows, next_cursor = await list_products_service(
+        category, min_price, max_price, min_quantity, name_prefix, cursor, limit,
+    )
+    products = [_product_out(p, p.category.name) for p in rows]
+    return {"products": products, "next_cursor": next_cursor}
@@ -2,10 +2,14 @@
 # This file contains helper functions that interact with the database.
 
 from prisma import Prisma
-import csv
-import io
-from fastapi import HTTPException
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timezone
 from typing import List
+from csv_parser import parse_text, shutdown_pool
+from export_cache import export_cache
+from category_cache import categories
 
 # Create Prisma client
 db = Prisma()
@@ -15,43 +19,293 @@ async def connect_db():
     await db.connect()
 
 async def disconnect_db():
-    """Disconnect Prisma from database"""
+    """Disconnect Prisma from database (and stop the CSV parse workers)"""
     await db.disconnect()
+    shutdown_pool()
 
 
 # ---------------- CSV Parsing ---------------- #
 def parse_csv_bytes(file_bytes: bytes) -> List[dict]:
     """Convert CSV file bytes into a list of dictionaries"""
-    text = file_bytes.decode("utf-8")
-    reader = csv.DictReader(io.StringIO(text))
-    rows = []
-    for r in reader:
-        try:
-            row = {
-                "name": r.get("name", "").strip(),
-                "price": float(r.get("price", 0) or 0),
-                "quantity": int(float(r.get("quantity", 0) or 0)),
-                "category": r.get("category", "").strip(),
-            }
-            rows.append(row)
-        except Exception as e:
-            raise ValueError(f"Invalid row in CSV: {r} -> {e}")
-    return rows
+    return parse_text(file_bytes.decode("utf-8"))
 
 
 # ---------------- Product Services ---------------- #
+# Columns that can be part of the natural key used by upsert imports
+# ("category" means the resolved category, stored as Product.category_id)
+KEY_FIELDS = ("name", "price", "quantity", "category")
+DEFAULT_IMPORT_KEY = ("name", "category")
+# Rows per create_many / batch update / existing-row lookup
+WRITE_CHUNK = 1000
+LOOKUP_CHUNK = 500
+# Page size of GET /products
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows per keyset page when streaming an export
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+# Extra margin subtracted from the delta export watermark (covers Prisma's @updatedAt, which is
+# stamped from the app server's clock rather than the database's)
+EXPORT_WATERMARK_LAG_MS = int(os.getenv("EXPORT_WATERMARK_LAG_MS", "5000"))
+# Default CSV ingest engine: "prisma" (ORM writes) or "copy" (Postgres COPY, see copy_ingest.py)
+INGEST_ENGINE = os.getenv("INGEST_ENGINE", "prisma")
+
+
+def key_columns(key_fields) -> tuple:
+    """Map import key fields to Product columns"""
+    return tuple("category_id" if f == "category" else f for f in key_fields)
+
+
+def row_hash(row) -> str:
+    """Content hash of a product row (same value for a dict or a Prisma record)"""
+    get = row.get if isinstance(row, dict) else lambda f: getattr(row, f)
+    text = "\x1f".join([get("name"), repr(float(get("price"))), str(int(get("quantity"))), str(get("category_id"))])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def with_hash(row: dict) -> dict:
+    return {**row, "content_hash": row_hash(row)}
+
+
+async def resolve_categories(rows) -> List[dict]:
+    """Replace each row's category name with its category_id (names resolved once per import)"""
+    ids = await categories.resolve(db, (r["category"] for r in rows))
+    return [
+        {"name": r["name"], "price": r["price"], "quantity": r["quantity"], "category_id": ids[r["category"]]}
+        for r in rows
+    ]
+
+
 async def add_product_service(data):
     """Insert one product into DB"""
-    return await db.product.create(data=data)
+    try:
+        rows = await resolve_categories([data])
+        return await db.product.create(data=with_hash(rows[0]), include={"category": True})
+    finally:
+        export_cache.note_write()
 
 async def bulk_insert_service(rows):
     """Insert multiple products (from CSV)"""
     created = []
-    for r in rows:
-        rec = await db.product.create(data=r)
-        created.append(rec)
+    try:
+        for r in await resolve_categories(rows):
+            rec = await db.product.create(data=with_hash(r))
+            created.append(rec)
+    finally:
+        export_cache.note_write()
     return created
 
+async def append_products_service(rows) -> dict:
+    """Insert rows with create_many (no per-row round trips and no records returned)"""
+    rows = [with_hash(r) for r in await resolve_categories(rows)]
+    try:
+        for start in range(0, len(rows), WRITE_CHUNK):
+            await db.product.create_many(data=rows[start:start + WRITE_CHUNK])
+    finally:
+        export_cache.note_write()
+    return {"inserted": len(rows)}
+
+async def upsert_products_service(rows, key_fields=DEFAULT_IMPORT_KEY) -> dict:
+    """
+    Idempotent delta import keyed on `key_fields` (e.g. name + category).
+    Rows whose key is new are inserted, rows whose content hash changed are updated,
+    and unchanged rows cause no write at all. Within one file the last row for a key wins.
+    """
+    columns = key_columns(key_fields)
+
+    def key_of(r) -> tuple:
+        return tuple(r[f] if isinstance(r, dict) else getattr(r, f) for f in columns)
+
+    rows = await resolve_categories(rows)
+    incoming = {}
+    for r in rows:
+        incoming[key_of(r)] = with_hash(r)
+
+    # Load the matching existing rows in chunks (OR of key equalities -> uses the key index)
+    existing = {}
+    keys = list(incoming)
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[start:start + LOOKUP_CHUNK]
+        found = await db.product.find_many(
+            where={"OR": [dict(zip(columns, k)) for k in chunk]},
+            order={"id": "asc"},
+        )
+        for rec in found:
+            existing.setdefault(key_of(rec), rec)   # oldest row wins if duplicates already exist
+
+    inserts, updates, unchanged = [], [], 0
+    for key, row in incoming.items():
+        rec = existing.get(key)
+        if rec is None:
+            inserts.append(row)
+        elif (rec.content_hash or row_hash(rec)) != row["content_hash"]:
+            updates.append((rec.id, row))
+        else:
+            unchanged += 1
+
+    try:
+        for start in range(0, len(inserts), WRITE_CHUNK):
+            await db.product.create_many(data=inserts[start:start + WRITE_CHUNK])
+        for start in range(0, len(updates), WRITE_CHUNK):
+            async with db.batch_() as batcher:
+                for rec_id, row in updates[start:start + WRITE_CHUNK]:
+                    batcher.product.update(where={"id": rec_id}, data=row)
+    finally:
+        export_cache.note_write()
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "unchanged": unchanged,
+        "duplicates_in_file": len(rows) - len(incoming),
+    }
+
+async def copy_ingest_service(rows, import_mode="append", key_fields=DEFAULT_IMPORT_KEY):
+    """
+    Bulk ingest through Postgres COPY + a set-based merge (copy_ingest.py).
+    Returns None when psycopg2 is not installed or the database can't be reached directly,
+    so the caller can fall back to the Prisma path.
+    """
+    try:
+        import psycopg2
+        import copy_ingest
+    except ImportError:
+        return None
+    try:
+        conn = await asyncio.to_thread(copy_ingest.connect)
+    except psycopg2.OperationalError:
+        return None
+    try:
+        rows = await resolve_categories(rows)
+    except BaseException:
+        conn.close()
+        raise
+    # Hashing happens lazily while COPY streams the rows (in the worker thread)
+    hashed = (with_hash(r) for r in rows)
+    try:
+        summary = await asyncio.to_thread(copy_ingest.copy_rows, conn, hashed, import_mode, key_columns(key_fields))
+    finally:
+        export_cache.note_write()
+    return {**summary, "engine": "copy"}
+
+SUMMARY_COUNTS = ("inserted", "updated", "unchanged", "duplicates_in_file")
+
+
+def merge_summary(total: dict, part: dict) -> dict:
+    """Add the counts of one ingested batch to a running import summary"""
+    for name in SUMMARY_COUNTS:
+        total[name] = total.get(name, 0) + part.get(name, 0)
+    total["engine"] = part["engine"]
+    return total
+
+async def ingest_rows(rows, import_mode="append", key_fields=DEFAULT_IMPORT_KEY, engine=INGEST_ENGINE) -> dict:
+    """Write one batch of parsed rows with the chosen engine ("copy" falls back to prisma); returns counts"""
+    if engine == "copy":
+        summary = await copy_ingest_service(rows, import_mode, key_fields)
+        if summary is not None:
+            return summary
+    if import_mode == "upsert":
+        return {**await upsert_products_service(rows, key_fields), "engine": "prisma"}
+    return {**await append_products_service(rows), "engine": "prisma"}
+
+async def list_products_service(
+    category=None, min_price=None, max_price=None, min_quantity=None, name_prefix=None,
+    cursor=None, limit=DEFAULT_PAGE_SIZE,
+) -> tuple:
+    """
+    Filtered product page in id order (keyset: WHERE id > cursor).
+    Returns (products, next_cursor); next_cursor is None on the last page.
+    """
+    where = {}
+    if category is not None:
+        category_id = await categories.lookup(db, category)
+        if category_id is None:
+            return [], None
+        where["category_id"] = category_id
+    price = {}
+    if min_price is not None:
+        price["gte"] = min_price
+    if max_price is not None:
+        price["lte"] = max_price
+    if price:
+        where["price"] = price
+    if min_quantity is not None:
+        where["quantity"] = {"gte": min_quantity}
+    if name_prefix:
+        where["name"] = {"startswith": name_prefix}
+    if cursor is not None:
+        where["id"] = {"gt": cursor}
+
+    # One extra row tells whether another page exists
+    rows = await db.product.find_many(where=where, order={"id": "asc"}, take=limit + 1, include={"category": True})
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
 async def fetch_all_products():
     """Fetch all products from DB"""
-    return await db.product.find_many()
+    return await db.product.find_many(include={"category": True})
+
+async def export_version() -> str:
+    """Data version used to key cached exports (see export_cache.py)"""
+    rows = await db.query_raw(
+        'SELECT COALESCE((EXTRACT(EPOCH FROM MAX(updated_at)) * 1000)::bigint, 0) AS max_updated_ms, '
+        'COALESCE(MAX(id), 0) AS max_id FROM "Product"'
+    )
+    return export_cache.version(rows[0]["max_updated_ms"], rows[0]["max_id"])
+
+async def export_watermark() -> datetime:
+    """
+    Point up to which every change is already committed, in UTC (millisecond precision like
+    Prisma DateTime). Writers stamp updated_at with their transaction's start time, so a
+    long import can commit rows older than now(): the watermark is the start of the oldest
+    transaction still open (or now() if none), minus EXPORT_WATERMARK_LAG_MS.
+    pg_stat_activity only shows other roles' sessions to members of pg_read_all_stats,
+    so the app's writers should all use the same database role.
+    """
+    rows = await db.query_raw(
+        "SELECT (EXTRACT(EPOCH FROM LEAST(now(), ("
+        "  SELECT MIN(xact_start) FROM pg_stat_activity"
+        "  WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        "  AND backend_type = 'client backend'"
+        ")) * 1000)::bigint AS start_ms"
+    )
+    return datetime.fromtimestamp((rows[0]["start_ms"] - EXPORT_WATERMARK_LAG_MS) / 1000, tz=timezone.utc)
+
+async def iter_product_batches(batch_size=EXPORT_BATCH_ROWS):
+    """Yield all products in id order, one keyset page (WHERE id > last) at a time"""
+    last_id = 0
+    while True:
+        batch = await db.product.find_many(
+            where={"id": {"gt": last_id}},
+            order={"id": "asc"},
+            take=batch_size,
+            include={"category": True},     # export joins the category name back in
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+async def iter_changed_batches(since: datetime, until: datetime, batch_size=EXPORT_BATCH_ROWS):
+    """Yield products with since < updated_at <= until, keyset paged on (updated_at, id)"""
+    window = {"updated_at": {"gt": since, "lte": until}}
+    after = None
+    while True:
+        where = window
+        if after is not None:
+            last_ts, last_id = after
+            where = {"AND": [window, {"OR": [
+                {"updated_at": {"gt": last_ts}},
+                {"updated_at": last_ts, "id": {"gt": last_id}},
+            ]}]}
+        batch = await db.product.find_many(
+            where=where,
+            order=[{"updated_at": "asc"}, {"id": "asc"}],
+            take=batch_size,
+            include={"category": True},
+        )
+        if not batch:
+            return
+        yield batch
+        after = (batch[-1].updated_at, batch[-1].id)
@@ -0,0 +1,206 @@
+# benchmarks/apps.py
+# How to start, prepare, seed and exercise each of the three implementations.
+#
+# Every app gets its own freshly created Postgres database so runs are reproducible.
+# Operations an app does not support are simply left out of its OPERATIONS map;
+# the driver skips (or re-weights) mixes accordingly.
+
+import os
+import subprocess
+import sys
+from urllib.parse import urlsplit, urlunsplit
+
+from benchmarks.dataset import products_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class AppSpec:
+    """One app under test: where it lives, how to start it and what it can do."""
+
+    def __init__(self, name, cwd, module, prepare_cmds, seed, operations):
+        self.name = name
+        self.cwd = os.path.join(ROOT, cwd)
+        self.module = module              # uvicorn "module:app" target
+        self.prepare_cmds = prepare_cmds  # commands (or fn(env, cwd)) that create the schema
+        self.seed = seed                  # async fn(client, data) -> state dict
+        self.operations = operations      # op name -> async fn(client, rng, state) -> response
+
+    def server_cmd(self, port: int) -> list:
+        return [sys.executable, "-m", "uvicorn", self.module, "--port", str(port), "--log-level", "warning"]
+
+    def prepare(self, env: dict) -> None:
+        for cmd in self.prepare_cmds:
+            if callable(cmd):
+                cmd(env, self.cwd)
+            else:
+                subprocess.run(cmd, cwd=self.cwd, env=env, check=True)
+
+
+def run_sql_file(path: str):
+    """Prepare step: run a .sql file against DATABASE_URL in autocommit mode (CREATE INDEX CONCURRENTLY)."""
+
+    def run(env: dict, cwd: str) -> None:
+        import psycopg2
+
+        parts = urlsplit(env["DATABASE_URL"])
+        # psycopg2 rejects Prisma's ?schema=... parameter
+        dsn = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        with open(os.path.join(cwd, path), encoding="utf-8") as f:
+            sql = f.read()
+        conn = psycopg2.connect(dsn)
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+        finally:
+            conn.close()
+
+    return run
+
+
+# ---------------- Seeding ---------------- #
+async def _seed_relational(client, data, product_path="/products/"):
+    """Assignment1/Assignment2: companies, categories, then products through the API."""
+    company_ids, category_ids = [], []
+    for c in data["companies"]:
+        r = await client.post("/companies/", json=c)
+        r.raise_for_status()
+        company_ids.append(r.json()["id"])
+    for c in data["categories"]:
+        r = await client.post("/categories/", json=c)
+        r.raise_for_status()
+        category_ids.append(r.json()["id"])
+    product_ids = []
+    for p in data["products"]:
+        r = await client.post(product_path, json={
+            "name": p["name"],
+            "description": p["description"],
+            "price": p["price"],
+            "stock": p["stock"],
+            "company_id": company_ids[p["company_idx"]],
+            "category_id": category_ids[p["category_idx"]],
+        })
+        r.raise_for_status()
+        product_ids.append(r.json()["id"])
+    return {"data": data, "company_ids": company_ids, "category_ids": category_ids, "product_ids": product_ids, "created": 0}
+
+
+async def _seed_csv(client, data):
+    """Assignment3: one CSV upload with the same products."""
+    r = await client.post("/upload-csv", files={"file": ("seed.csv", products_csv(data), "text/csv")})
+    r.raise_for_status()
+    return {"data": data, "created": 0}
+
+
+# ---------------- Operations ---------------- #
+def _search_term(rng, state):
+    return rng.choice(state["data"]["products"])["name"].split()[0]
+
+
+async def _browse(client, rng, state):
+    skip = rng.randrange(max(1, len(state["data"]["products"]) - 10))
+    return await client.get("/products/", params={"skip": skip, "limit": 10})
+
+
+async def _detail(client, rng, state):
+    return await client.get(f"/products/{rng.choice(state['product_ids'])}")
+
+
+async def _create_relational(client, rng, state):
+    state["created"] += 1
+    return await client.post("/products/", json={
+        "name": f"loadtest {rng.random():.12f} {state['created']}",
+        "description": "created by load test",
+        "price": round(rng.uniform(5, 1000), 2),
+        "stock": rng.randint(0, 100),
+        "company_id": rng.choice(state["company_ids"]),
+        "category_id": rng.choice(state["category_ids"]),
+    })
+
+
+async def _a1_search(client, rng, state):
+    return await client.get("/products/search", params={"q": _search_term(rng, state), "limit": 10})
+
+
+async def _a1_export(client, rng, state):
+    return await client.get("/products/stream")
+
+
+async def _a2_search(client, rng, state):
+    return await client.get("/products/search/", params={"q": _search_term(rng, state), "limit": 10})
+
+
+async def _a3_create(client, rng, state):
+    state["created"] += 1
+    return await client.post("/add-product", json={
+        "name": f"loadtest {rng.random():.12f} {state['created']}",
+        "price": round(rng.uniform(5, 1000), 2),
+        "quantity": rng.randint(0, 100),
+        "category": rng.choice(state["data"]["categories"])["name"],
+    })
+
+
+async def _a3_import(client, rng, state):
+    start = rng.randrange(max(1, len(state["data"]["products"]) - 100))
+    body = products_csv(state["data"], start, start + 100)
+    return await client.post("/upload-csv", files={"file": ("batch.csv", body, "text/csv")})
+
+
+async def _a3_export(client, rng, state):
+    return await client.get("/download-csv")
+
+
+async def _a3_browse(client, rng, state):
+    low = rng.uniform(5, 90000)
+    return await client.get("/products", params={
+        "category": rng.choice(state["data"]["categories"])["name"],
+        "min_price": round(low, 2),
+        "max_price": round(low + 10000, 2),
+        "limit": 10,
+    })
+
+
+async def _a3_search(client, rng, state):
+    return await client.get("/products", params={"name_prefix": _search_term(rng, state), "limit": 10})
+
+
+def app_specs() -> dict:
+    prisma = os.getenv("PRISMA_BIN", "prisma")
+    return {
+        "assignment1": AppSpec(
+            "assignment1", "Assignment1", "app.main:app",
+            # explicit migration (importing app.main no longer runs DDL)
+            [[sys.executable, "-m", "app.migrate"]],
+            _seed_relational,
+            {"browse": _browse, "search": _a1_search, "detail": _detail,
+             "create": _create_relational, "bulk_export": _a1_export},
+        ),
+        "assignment2": AppSpec(
+            "assignment2", "Assignment2", "app.main:app",
+            [[prisma, "migrate", "deploy"]],
+            _seed_relational,
+            {"browse": _browse, "search": _a2_search, "detail": _detail,
+             "create": _create_relational},
+        ),
+        "assignment3": AppSpec(
+            "assignment3", "Assignment3", "main:app",
+            # db push drops indexes schema.prisma can't declare: recreate them afterwards
+            [[prisma, "db", "push", "--skip-generate", "--accept-data-loss"],
+             run_sql_file("prisma/product_indexes.sql")],
+            _seed_csv,
+            {"browse": _a3_browse, "search": _a3_search, "create": _a3_create,
+             "bulk_import": _a3_import, "bulk_export": _a3_export},
+        ),
+    }
+
+
+# Scripted request mixes: op name -> weight
+MIXES = {
+    "browse": {"browse": 1},
+    "search": {"search": 1},
+    "detail": {"detail": 1},
+    "create": {"create": 1},
+    "mixed": {"browse": 50, "detail": 30, "search": 15, "create": 5},
+    "bulk": {"bulk_export": 3, "bulk_import": 1},
+}
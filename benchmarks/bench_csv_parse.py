@@ -0,0 +1,58 @@
+# benchmarks/bench_csv_parse.py
+"""
+Sequential vs process-pool CSV parsing (Assignment3 csv_parser).
+
+    python -m benchmarks.bench_csv_parse --rows 2000000 --workers 1,2,4,8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Assignment3"))
+
+import csv_parser  # noqa: E402
+
+from benchmarks.dataset import generate, products_csv  # noqa: E402
+
+
+def build_file(rows: int) -> bytes:
+    # Repeat a 100k-row deterministic block to reach the requested size quickly
+    block_rows = min(rows, 100_000)
+    block = products_csv(generate(n_products=block_rows))
+    header, body = block.split(b"\n", 1)
+    repeats, remainder = divmod(rows, block_rows)
+    tail = b"".join(body.splitlines(keepends=True)[:remainder])
+    return header + b"\n" + body * repeats + tail
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count()}")
+    parser.add_argument("--chunk-mb", type=float, default=8)
+    args = parser.parse_args()
+
+    data = build_file(args.rows)
+    print(f"{args.rows} rows, {len(data) / 1e6:.1f} MB")
+
+    t0 = time.perf_counter()
+    expected = csv_parser.parse_text(data.decode("utf-8"))
+    seq = time.perf_counter() - t0
+    print(f"{'sequential':<14} {seq:8.2f}s  {args.rows / seq:>12,.0f} rows/s")
+
+    chunk = int(args.chunk_mb * 1024 * 1024)
+    for workers in sorted({int(w) for w in args.workers.split(",")}):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            t0 = time.perf_counter()
+            rows = asyncio.run(csv_parser.parse_csv_bytes_parallel(data, executor=pool, chunk_size=chunk))
+            elapsed = time.perf_counter() - t0
+        assert len(rows) == len(expected)
+        print(f"{f'{workers} workers':<14} {elapsed:8.2f}s  {args.rows / elapsed:>12,.0f} rows/s  x{seq / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
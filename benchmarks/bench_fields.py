@@ -0,0 +1,58 @@
+# benchmarks/bench_fields.py
+"""
+Payload size and latency of full rows vs sparse fieldsets on Assignment2 product endpoints.
+
+Start Assignment2 against a seeded database first (e.g. the one left by benchmarks.loadtest), then:
+    python -m benchmarks.bench_fields --url http://127.0.0.1:8000 --limit 100 --iterations 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.loadtest import percentile
+
+VARIANTS = [
+    ("list full", "/products/", {}),
+    ("list full + related", "/products/", {"include_related": "true"}),
+    ("list fields=id,name,price", "/products/", {"fields": "id,name,price"}),
+    ("list fields=id,name,price,company.name", "/products/", {"fields": "id,name,price,company.name"}),
+    ("search full", "/products/search/", {"q": "pro"}),
+    ("search fields=id,name,price", "/products/search/", {"q": "pro", "fields": "id,name,price"}),
+]
+
+
+async def measure(client, path: str, params: dict, iterations: int) -> dict:
+    latencies, sizes = [], []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        response = await client.get(path, params=params)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        response.raise_for_status()
+        sizes.append(len(response.content))
+    latencies.sort()
+    return {
+        "bytes": sum(sizes) // len(sizes),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        print(f"{'variant':<42} {'bytes':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for name, path, params in VARIANTS:
+            stats = await measure(client, path, {**params, "limit": args.limit}, args.iterations)
+            print(f"{name:<42} {stats['bytes']:>9} {stats['p50_ms']:>9} {stats['p95_ms']:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
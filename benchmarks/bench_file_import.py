@@ -0,0 +1,139 @@
+# benchmarks/bench_file_import.py
+"""
+Assignment3: multipart /upload-csv vs server-side POST /admin/import-file on a multi-GB CSV.
+
+Writes a --mb sized CSV into a scratch import directory, then for each path starts a fresh
+Assignment3 server (fresh database, IMPORT_ALLOWED_DIR = that directory) and reports wall time,
+the server process's peak RSS and, separately, the summed peak RSS of its child processes
+(the CSV parse/validate pool workers). VmHWM, Linux only.
+
+    python -m benchmarks.bench_file_import --mb 2048
+    python -m benchmarks.bench_file_import --mb 4096 --ingest      # also write rows (COPY engine)
+
+Without --ingest both paths run in dry_run mode (read + validate only).
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.apps import app_specs
+from benchmarks.dataset import generate, products_csv
+from benchmarks.loadtest import database_url, recreate_database, wait_ready
+
+
+def write_file(path: str, mb: int) -> int:
+    """Repeat a deterministic 100k-row block until the file reaches `mb` megabytes; returns rows"""
+    header, body = products_csv(generate(n_products=100_000)).split(b"\n", 1)
+    block_rows = body.count(b"\n")
+    rows = 0
+    with open(path, "wb") as f:
+        f.write(header + b"\n")
+        while f.tell() < mb * 1024 * 1024:
+            f.write(body)
+            rows += block_rows
+    return rows
+
+
+def peak_rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def child_pids(pid: int) -> list:
+    """All descendants of `pid` (children of every thread, recursively)"""
+    found = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return found
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children = [int(c) for c in f.read().split()]
+        except OSError:
+            continue
+        for child in children:
+            found.append(child)
+            found.extend(child_pids(child))
+    return found
+
+
+def children_peak_rss_mb(pid: int) -> tuple:
+    """(sum of the children's peak RSS in MB, number of children); the peaks may not overlap in time"""
+    peaks = [peak_rss_mb(child) for child in child_pids(pid)]
+    peaks = [p for p in peaks if p == p]    # drop NaN (child exited meanwhile)
+    return sum(peaks), len(peaks)
+
+
+async def run_upload(client, path: str, params: dict):
+    with open(path, "rb") as f:
+        return await client.post("/upload-csv", params=params, files={"file": ("catalog.csv", f, "text/csv")})
+
+
+async def run_server_side(client, path: str, params: dict):
+    return await client.post("/admin/import-file", json={
+        "path": os.path.basename(path),
+        "dry_run": params["dry_run"],
+        "engine": params["engine"],
+    })
+
+
+async def measure(name: str, runner, path: str, args, port: int) -> None:
+    spec = app_specs()["assignment3"]
+    db_name = f"bench_file_import_{name}"
+    recreate_database(db_name)
+    env = dict(os.environ, DATABASE_URL=database_url(db_name), IMPORT_ALLOWED_DIR=os.path.dirname(path))
+    spec.prepare(env)
+    proc = subprocess.Popen(spec.server_cmd(port), cwd=spec.cwd, env=env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_ready(base_url, proc)
+        params = {"mode": "skip_invalid", "dry_run": not args.ingest, "engine": "copy"}
+        async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+            t0 = time.perf_counter()
+            response = await runner(client, path, params)
+            elapsed = time.perf_counter() - t0
+        response.raise_for_status()
+        body = response.json()
+        rows = body["report"]["valid_rows"]
+        # Read before terminate(): the pool workers live as long as the server
+        workers_mb, workers = children_peak_rss_mb(proc.pid)
+        print(f"{name:<12} {elapsed:8.1f}s  {rows / elapsed:>12,.0f} rows/s  peak RSS {peak_rss_mb(proc.pid):8.0f} MB"
+              f"  workers {workers_mb:8.0f} MB ({workers} procs)  inserted={body.get('inserted', 0)}")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=2048)
+    parser.add_argument("--ingest", action="store_true", help="write the rows too (engine=copy)")
+    parser.add_argument("--port", type=int, default=8093)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_import_") as directory:
+        path = os.path.join(directory, "catalog.csv")
+        rows = write_file(path, args.mb)
+        print(f"{rows:,} rows, {os.path.getsize(path) / 1e9:.2f} GB")
+        asyncio.run(measure("upload", run_upload, path, args, args.port))
+        asyncio.run(measure("server-side", run_server_side, path, args, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_ingest.py
+"""
+Assignment3 CSV ingest: Prisma writes vs Postgres COPY + set-based merge.
+
+Each engine runs against a freshly created database (same LOADTEST_PG_URL as the load test):
+  append   - import N new rows
+  reimport - upsert the same N rows again (all unchanged, no writes expected)
+  update   - upsert N rows where every 10th price changed
+
+    python -m benchmarks.bench_ingest --rows 100000
+    python -m benchmarks.bench_ingest --rows 1000000 --engines copy
+
+The Prisma append path inserts row by row, so keep --prisma-rows small.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks.apps import app_specs
+from benchmarks.dataset import generate, products_csv
+from benchmarks.loadtest import database_url, recreate_database
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Assignment3"))
+
+
+def build_rows(n: int) -> list:
+    import csv_parser
+
+    return csv_parser.parse_text(products_csv(generate(n_products=n)).decode("utf-8"))
+
+
+async def run_engine(engine: str, rows: list) -> list:
+    import service
+
+    changed = [dict(r, price=r["price"] + 1) if i % 10 == 0 else r for i, r in enumerate(rows)]
+    await service.connect_db()
+    results = []
+    try:
+        for step, data, mode in (("append", rows, "append"), ("reimport", rows, "upsert"), ("update", changed, "upsert")):
+            t0 = time.perf_counter()
+            if engine == "copy":
+                summary = await service.copy_ingest_service(data, mode)
+                if summary is None:
+                    raise SystemExit("psycopg2 missing or database unreachable: COPY engine unavailable")
+            elif mode == "append":
+                summary = {"inserted": len(await service.bulk_insert_service(data))}
+            else:
+                summary = await service.upsert_products_service(data)
+            elapsed = time.perf_counter() - t0
+            summary.pop("engine", None)
+            results.append((step, elapsed, summary))
+    finally:
+        await service.disconnect_db()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="rows for the COPY engine")
+    parser.add_argument("--prisma-rows", type=int, default=10_000, help="rows for the Prisma engine")
+    parser.add_argument("--engines", default="prisma,copy")
+    args = parser.parse_args()
+
+    spec = app_specs()["assignment3"]
+    for engine in args.engines.split(","):
+        n = args.rows if engine == "copy" else args.prisma_rows
+        rows = build_rows(n)
+        db_name = f"bench_ingest_{engine}"
+        recreate_database(db_name)
+        env = dict(os.environ, DATABASE_URL=database_url(db_name))
+        spec.prepare(env)
+        # service.py's Prisma client and copy_ingest both read DATABASE_URL from the environment
+        os.environ["DATABASE_URL"] = env["DATABASE_URL"]
+        for step, elapsed, summary in asyncio.run(run_engine(engine, rows)):
+            print(f"{engine:<7} {step:<9} {n:>9} rows {elapsed:8.2f}s  {n / elapsed:>12,.0f} rows/s  {summary}")
+
+
+if __name__ == "__main__":
+    main()
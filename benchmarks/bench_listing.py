@@ -0,0 +1,118 @@
+# benchmarks/bench_listing.py
+"""
+Assignment3 GET /products filter queries at a few million rows.
+
+Loads --rows products through the COPY ingest path into a fresh database, runs ANALYZE,
+then times each query shape (service.list_products_service, first page and a deep page).
+With --explain it prints the plans Postgres picked and warns when the name prefix query
+does not use the text_pattern_ops index.
+
+    python -m benchmarks.bench_listing --rows 3000000 --repeat 50
+
+Needs psycopg2, the prisma CLI and a local Postgres (LOADTEST_PG_URL).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from benchmarks.apps import app_specs
+from benchmarks.dataset import generate
+from benchmarks.loadtest import database_url, percentile, recreate_database
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Assignment3"))
+
+LOAD_CHUNK = 500_000
+
+QUERIES = {
+    "category": lambda rng, cats: {"category": rng.choice(cats)},
+    "category+price": lambda rng, cats: {"category": rng.choice(cats), "max_price": 1000.0, "min_quantity": 1},
+    "price range": lambda rng, cats: {"min_price": 500.0, "max_price": 510.0},
+    "name prefix": lambda rng, cats: {"name_prefix": f"{rng.choice(['laptop', 'phone', 'desk'])} pro"},
+}
+
+
+async def load(service, rows: int) -> list:
+    block = generate(n_products=min(rows, LOAD_CHUNK))
+    categories = [c["name"] for c in block["categories"]]
+    base = [
+        {"name": p["name"], "price": p["price"], "quantity": p["stock"], "category": categories[p["category_idx"]]}
+        for p in block["products"]
+    ]
+    loaded = 0
+    while loaded < rows:
+        chunk = base[: rows - loaded]
+        if await service.copy_ingest_service(chunk) is None:
+            raise SystemExit("psycopg2 missing or database unreachable: COPY engine unavailable")
+        loaded += len(chunk)
+        print(f"loaded {loaded:,} rows")
+    await service.db.execute_raw('ANALYZE "Product"')
+    return categories
+
+
+async def explain(db, label: str, expected_index, sql: str) -> None:
+    plan = [line["QUERY PLAN"] for line in await db.query_raw(f"EXPLAIN {sql}")]
+    print(f"plan for {label}:")
+    for line in plan:
+        print("   ", line)
+    if expected_index and not any(expected_index in line for line in plan):
+        print(f"    WARNING: {expected_index} not used")
+
+
+async def run(args) -> None:
+    import service
+
+    await service.connect_db()
+    try:
+        categories = await load(service, args.rows)
+        rng = random.Random(args.seed)
+        print(f"{'query':<16} {'page':<6} {'p50 ms':>8} {'p95 ms':>8} {'rows':>6}")
+        for name, make in QUERIES.items():
+            for page in ("first", "deep"):
+                timings, returned = [], 0
+                for _ in range(args.repeat):
+                    filters = make(rng, categories)
+                    cursor = args.rows // 2 if page == "deep" else None
+                    t0 = time.perf_counter()
+                    rows, _ = await service.list_products_service(**filters, cursor=cursor, limit=args.limit)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                    returned = len(rows)
+                timings.sort()
+                print(f"{name:<16} {page:<6} {percentile(timings, 50):8.2f} {percentile(timings, 95):8.2f} {returned:>6}")
+        if args.explain:
+            category_id = await service.categories.lookup(service.db, categories[0])
+            await explain(
+                service.db, "category+price", None,
+                f'SELECT * FROM "Product" WHERE category_id = {int(category_id)} AND price <= 1000 ORDER BY id LIMIT 101',
+            )
+            # Same shape as Prisma's startswith filter; must use the text_pattern_ops index
+            await explain(
+                service.db, "name prefix", "Product_name_pattern_idx",
+                """SELECT * FROM "Product" WHERE name LIKE 'laptop pro%' ORDER BY id LIMIT 101""",
+            )
+    finally:
+        await service.disconnect_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--explain", action="store_true", help="print the plans of the category+price and name prefix queries")
+    args = parser.parse_args()
+
+    db_name = "bench_listing"
+    recreate_database(db_name)
+    env = dict(os.environ, DATABASE_URL=database_url(db_name))
+    app_specs()["assignment3"].prepare(env)
+    os.environ["DATABASE_URL"] = env["DATABASE_URL"]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
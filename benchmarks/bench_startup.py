@@ -0,0 +1,88 @@
+# benchmarks/bench_startup.py
+"""
+Startup time of the Assignment1 and Assignment2 apps: process start -> first served request.
+
+For each app (and, for Assignment1, each SCHEMA_STARTUP_MODE) the server is started --runs
+times against an already migrated database. Two numbers are reported per run:
+  import  - `import app.main` alone, in a fresh interpreter
+  first   - uvicorn process start until GET /products/?limit=1 returns 200
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --apps assignment1 --modes verify,skip
+
+Needs httpx, uvicorn, psycopg2, the prisma CLI and a local Postgres (LOADTEST_PG_URL).
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.apps import app_specs
+from benchmarks.loadtest import database_url, recreate_database
+
+FIRST_REQUEST = "/products/?limit=1"
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def time_import(spec, env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=spec.cwd, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_first_request(spec, env: dict, port: int, timeout: float = 60.0) -> float:
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(spec.server_cmd(port), cwd=spec.cwd, env=env)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - t0 < timeout:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"server exited with code {proc.returncode}")
+                try:
+                    response = client.get(FIRST_REQUEST)
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                response.raise_for_status()
+                return time.perf_counter() - t0
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", default="assignment1,assignment2")
+    parser.add_argument("--modes", default="verify,create,skip", help="SCHEMA_STARTUP_MODE values for Assignment1")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8094)
+    args = parser.parse_args()
+
+    specs = app_specs()
+    print(f"{'app':<12} {'mode':<8} {'import ms':>10} {'first req ms':>13}  (median of {args.runs})")
+    for name in args.apps.split(","):
+        spec = specs[name]
+        db_name = f"bench_startup_{name}"
+        recreate_database(db_name)
+        base_env = dict(os.environ, DATABASE_URL=database_url(db_name))
+        spec.prepare(base_env)
+        modes = args.modes.split(",") if name == "assignment1" else ["-"]
+        for mode in modes:
+            env = dict(base_env, SCHEMA_STARTUP_MODE=mode) if mode != "-" else base_env
+            imports = [time_import(spec, env) for _ in range(args.runs)]
+            firsts = [time_first_request(spec, env, args.port) for _ in range(args.runs)]
+            print(f"{name:<12} {mode:<8} {statistics.median(imports) * 1000:>10.0f} "
+                  f"{statistics.median(firsts) * 1000:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/compare.py
+# Compare two load-test result files (e.g. from two commits).
+# Usage: python -m benchmarks.compare baseline.json candidate.json
+
+import json
+import sys
+
+
+def _index(report: dict) -> dict:
+    return {(r["app"], r["mix"], r["concurrency"]): r for r in report["results"]}
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python -m benchmarks.compare baseline.json candidate.json")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        old = json.load(f)
+    with open(argv[1], encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"baseline  {old['meta']['commit'][:12]}  {old['meta']['timestamp']}")
+    print(f"candidate {new['meta']['commit'][:12]}  {new['meta']['timestamp']}")
+    print(f"{'app':<12} {'mix':<8} {'c':>4} {'rps':>10} {'Δrps':>8} {'p95 ms':>9} {'Δp95':>8} {'p99 ms':>9} {'Δp99':>8}")
+    old_rows, new_rows = _index(old), _index(new)
+    for key in sorted(old_rows.keys() & new_rows.keys()):
+        o, n = old_rows[key], new_rows[key]
+        # Runs over the error threshold measured failures, not the app (older files have no flag)
+        if not (o.get("valid", True) and n.get("valid", True)):
+            print(f"{key[0]:<12} {key[1]:<8} {key[2]:>4}  skipped: error rate over the threshold "
+                  f"(baseline {o.get('error_rate', 0):.1%}, candidate {n.get('error_rate', 0):.1%})")
+            continue
+        print(f"{key[0]:<12} {key[1]:<8} {key[2]:>4} "
+              f"{n['throughput_rps']:>10} {_delta(o['throughput_rps'], n['throughput_rps']):>8} "
+              f"{n['latency_ms']['p95']:>9} {_delta(o['latency_ms']['p95'], n['latency_ms']['p95']):>8} "
+              f"{n['latency_ms']['p99']:>9} {_delta(o['latency_ms']['p99'], n['latency_ms']['p99']):>8}")
+    for key in sorted(old_rows.keys() ^ new_rows.keys()):
+        print(f"{key[0]:<12} {key[1]:<8} {key[2]:>4}  only in {'baseline' if key in old_rows else 'candidate'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
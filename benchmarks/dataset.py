@@ -0,0 +1,46 @@
+# benchmarks/dataset.py
+# Deterministic seed data shared by every app in the load test.
+# The same seed always produces the same companies, categories and products,
+# so results from different apps (and different commits) are comparable.
+
+import csv
+import io
+import random
+
+WORDS = [
+    "laptop", "phone", "tablet", "monitor", "keyboard", "mouse", "camera", "speaker",
+    "charger", "cable", "router", "printer", "desk", "chair", "lamp", "bottle",
+    "shirt", "shoe", "jacket", "watch", "pen", "notebook", "bag", "milk", "biscuit",
+]
+ADJECTIVES = ["pro", "mini", "max", "lite", "ultra", "classic", "smart", "eco", "plus", "air"]
+CITIES = ["Pune", "Mumbai", "Delhi", "Bengaluru", "Chennai", "Hyderabad", "Kolkata", None]
+
+
+def generate(n_companies: int = 50, n_categories: int = 20, n_products: int = 5000, seed: int = 42) -> dict:
+    """Return {"companies": [...], "categories": [...], "products": [...]}.
+    Products reference companies/categories by list index (0-based)."""
+    rng = random.Random(seed)
+    companies = [{"name": f"Company {i:05d}", "location": rng.choice(CITIES)} for i in range(n_companies)]
+    categories = [{"name": f"Category {i:03d}"} for i in range(n_categories)]
+    products = []
+    for i in range(n_products):
+        word = rng.choice(WORDS)
+        products.append({
+            "name": f"{word} {rng.choice(ADJECTIVES)} {i:07d}",
+            "description": f"{word} for everyday use, batch {rng.randint(1, 500)}",
+            "price": round(rng.uniform(5, 100000), 2),
+            "stock": rng.randint(0, 1000),
+            "company_idx": rng.randrange(n_companies),
+            "category_idx": rng.randrange(n_categories),
+        })
+    return {"companies": companies, "categories": categories, "products": products}
+
+
+def products_csv(data: dict, start: int = 0, stop: int | None = None) -> bytes:
+    """Render products in the Assignment3 CSV layout: name,price,quantity,category"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["name", "price", "quantity", "category"])
+    for p in data["products"][start:stop]:
+        writer.writerow([p["name"], p["price"], p["stock"], data["categories"][p["category_idx"]]["name"]])
+    return out.getvalue().encode("utf-8")
@@ -0,0 +1,5 @@
+# pm_common
+# Code shared by Assignment1, Assignment2 and Assignment3:
+# - pm_common.profiler     optional sampling request profiler (PROFILE_ENABLED=1);
+#                          each app imports it through its own wrapper (app/utils/profiler.py, profiler.py)
+# - pm_common.concurrency  per-route concurrency limit + load shedding (Assignment2, Assignment3)
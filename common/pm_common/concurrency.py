@@ -0,0 +1,209 @@
+# pm_common/concurrency.py
+"""
+Per-route concurrency limiting with a bounded wait queue (load shedding).
+Shared by the two Prisma apps (Assignment2 and Assignment3).
+
+Purpose:
+- At most `limit` requests per route run at the same time; the next `max_queue` wait in FIFO order.
+- When the queue is full the request is rejected immediately with 503 + Retry-After,
+  and a queued request that waits longer than `queue_timeout` is rejected the same way.
+  The service degrades gracefully instead of piling everything onto the Prisma query engine.
+- In-flight, queue depth, admitted, rejected and timed-out counts are exposed for /metrics.
+
+Settings (environment variables):
+- CONCURRENCY_DEFAULT_LIMIT  concurrent requests per route (default 32)
+- CONCURRENCY_LIMITS         per-route overrides, e.g. "/products/=16,/upload-csv=2"
+- CONCURRENCY_MAX_QUEUE      waiting requests per route before shedding (default 64)
+- CONCURRENCY_QUEUE_TIMEOUT  seconds a request may wait in the queue (default 5)
+- CONCURRENCY_RETRY_AFTER    value of the Retry-After header in seconds (default 1)
+
+Java comparison:
+- Similar to a Resilience4j Bulkhead (maxConcurrentCalls + maxWaitDuration) per endpoint.
+"""
+
+import asyncio
+import os
+from collections import deque
+
+from starlette.routing import Match, Route
+
+DEFAULT_LIMIT = int(os.getenv("CONCURRENCY_DEFAULT_LIMIT", "32"))
+MAX_QUEUE = int(os.getenv("CONCURRENCY_MAX_QUEUE", "64"))
+QUEUE_TIMEOUT = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT", "5"))
+RETRY_AFTER = os.getenv("CONCURRENCY_RETRY_AFTER", "1")
+# Never shed these (monitoring and docs must keep working under load)
+EXEMPT_PATHS = {"/metrics", "/docs", "/openapi.json", "/redoc"}
+
+
+def _parse_limits(text: str) -> dict:
+    limits = {}
+    for item in text.split(","):
+        if "=" in item:
+            path, value = item.rsplit("=", 1)
+            limits[path.strip()] = int(value)
+    return limits
+
+
+class RouteLimiter:
+    """Semaphore with a bounded FIFO queue for one route."""
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over by resolving the future (in_flight stays the same)
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            self.admitted += 1
+            return True
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away after we were handed a slot: give it back
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def metrics(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class LimiterRegistry:
+    """One RouteLimiter per route path template (created on first use)."""
+
+    def __init__(self, default_limit: int, limits: dict, max_queue: int, queue_timeout: float):
+        self.default_limit = default_limit
+        self.limits = limits
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._limiters = {}
+
+    def get(self, key: str) -> RouteLimiter:
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limit = self.limits.get(key, self.default_limit)
+            limiter = self._limiters[key] = RouteLimiter(limit, self.max_queue, self.queue_timeout)
+        return limiter
+
+    def metrics(self) -> dict:
+        return {key: limiter.metrics() for key, limiter in sorted(self._limiters.items())}
+
+
+class ConcurrencyLimitMiddleware:
+    """Pure ASGI middleware: find the route template, then acquire that route's limiter."""
+
+    def __init__(self, app, registry: LimiterRegistry):
+        self.app = app
+        self.registry = registry
+        self._routes = None     # flattened HTTP routes, collected on the first request
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if self._routes is None:
+            # Routes are all registered by the time requests arrive
+            self._routes = list(_http_routes(getattr(getattr(scope.get("app"), "router", None), "routes", ())))
+        limiter = self.registry.get(_route_key(scope, self._routes))
+        if not await limiter.acquire():
+            await _reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+def _http_routes(routes):
+    """
+    Yield the plain HTTP routes (APIRoute is a Route), looking inside included routers.
+    Newer FastAPI versions keep an included router as ONE entry (no .path) instead of copying
+    its routes into app.routes, so go through its original router's routes; anything else
+    (mounts, websockets, unknown entries) is skipped.
+    Note: only the APIRouter(prefix=...) is part of route.path; the apps don't use
+    include_router(prefix=...).
+    """
+    for route in routes:
+        if isinstance(route, Route) and getattr(route, "path", None) is not None:
+            yield route
+        else:
+            yield from _http_routes(getattr(getattr(route, "original_router", None), "routes", ()))
+
+
+def _route_key(scope, routes) -> str:
+    # Routing hasn't happened yet, so match against the app's routes ourselves
+    # ("/products/{product_id}" rather than "/products/42")
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "*"
+
+
+async def _reject(send) -> None:
+    body = b'{"detail":"Server busy, retry later"}'
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", RETRY_AFTER.encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def install_concurrency_limiter(app) -> LimiterRegistry:
+    """Add the middleware and return the registry (for the /metrics endpoint)."""
+    registry = LimiterRegistry(
+        DEFAULT_LIMIT,
+        _parse_limits(os.getenv("CONCURRENCY_LIMITS", "")),
+        MAX_QUEUE,
+        QUEUE_TIMEOUT,
+    )
+    app.add_middleware(ConcurrencyLimitMiddleware, registry=registry)
+    return registry
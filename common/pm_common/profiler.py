@@ -0,0 +1,220 @@
+# pm_common/profiler.py
+"""
+Sampling request profiler shared by the three apps (optional, off by default).
+The apps import this module only when PROFILE_ENABLED=1 (see their profiler.py wrappers).
+
+Purpose:
+- Profile a configurable fraction of requests, or any request carrying the debug header,
+  with pyinstrument (a sampling profiler).
+- Write one speedscope file per profiled request and keep a per-route aggregated profile
+  that is flushed every few samples and at shutdown.
+- Rendering and writing the files happens in a worker thread (asyncio.to_thread), so a
+  profiled request does not block the event loop for the other requests.
+
+Two modes:
+- "async"  (Prisma apps, async def routes): one profiler on the event loop follows the
+           request across awaits, so DB waits, validation and JSON show up in one profile.
+- "thread" (Assignment1, sync def routes): FastAPI runs the route in the threadpool, which an
+           event-loop profiler only sees as "await threadpool". The routers use ProfiledRoute,
+           which starts a second profiler inside the worker thread around the route function,
+           so SQL and ORM time get their own profile ("<route> [route thread]"). The event-loop
+           profile still shows response serialization and JSON rendering.
+
+Settings (environment variables):
+- PROFILE_ENABLED      "1" to install the middleware at all (default: off -> zero overhead)
+- PROFILE_SAMPLE_RATE  fraction of requests to profile, e.g. 0.01 (default 0)
+- PROFILE_HEADER       request header that forces profiling (default "x-profile")
+- PROFILE_DIR          output directory (default "profiles")
+- PROFILE_INTERVAL     sampling interval in seconds (default 0.001)
+- PROFILE_FLUSH_EVERY  write the per-route aggregate every N samples (default 20)
+
+Java comparison:
+- Similar to attaching async-profiler to a few requests and dumping flamegraphs.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import os
+import random
+import re
+import time
+
+from fastapi.routing import APIRoute
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "x-profile").lower().encode("latin-1")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_FLUSH_EVERY = int(os.getenv("PROFILE_FLUSH_EVERY", "20"))
+
+THREAD_SUFFIX = " [route thread]"
+
+logger = logging.getLogger(__name__)
+
+# Set by the middleware for a selected request: list that collects the route-thread sessions.
+# Context variables are copied into run_in_threadpool, so the worker thread sees it.
+_thread_sessions = contextvars.ContextVar("profile_thread_sessions", default=None)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware (cheaper than BaseHTTPMiddleware).
+    Requests that are not selected only pay for one random() call and a header scan.
+    """
+
+    def __init__(self, app, mode: str = "async"):
+        # pyinstrument is imported lazily so the app does not need it unless profiling is on
+        from pyinstrument import Profiler
+        from pyinstrument.session import Session
+
+        self.app = app
+        self.mode = mode
+        self._profiler_cls = Profiler
+        self._session_cls = Session
+        self._aggregates = {}   # route key -> combined pyinstrument Session
+        self._pending = {}      # route key -> samples since last flush
+        self._sequence = itertools.count(1)   # makes per-request file names unique
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        thread_sessions = []
+        token = _thread_sessions.set(thread_sessions) if self.mode == "thread" else None
+        profiler = self._profiler_cls(interval=PROFILE_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session = profiler.stop()
+            if token is not None:
+                _thread_sessions.reset(token)
+            key = _route_key(scope)
+            await self._record(key, session)
+            for thread_session in thread_sessions:
+                await self._record(key + THREAD_SUFFIX, thread_session)
+
+    def _selected(self, scope) -> bool:
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return True
+        for name, _ in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return True
+        return False
+
+    async def _record(self, key: str, session) -> None:
+        # Bookkeeping stays on the event loop; rendering + file I/O run in a thread
+        slug = _slugify(key)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        # pid + sequence number: unique even for many requests per second and several workers
+        path = os.path.join(PROFILE_DIR, f"{slug}-{stamp}-{os.getpid()}-{next(self._sequence)}.speedscope.json")
+        await asyncio.to_thread(_write_speedscope, path, session)
+
+        previous = self._aggregates.get(key)
+        # combine() builds a new Session, so a render still running in a thread is not affected
+        self._aggregates[key] = session if previous is None else self._session_cls.combine(previous, session)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        if self._pending[key] >= PROFILE_FLUSH_EVERY:
+            self._pending[key] = 0
+            await asyncio.to_thread(_write_aggregate, key, self._aggregates[key])
+
+    def flush(self) -> None:
+        """Write every per-route aggregate (called at shutdown, from a worker thread)."""
+        for key, session in list(self._aggregates.items()):
+            _write_aggregate(key, session)
+            self._pending[key] = 0
+
+
+def _write_speedscope(path: str, session) -> None:
+    from pyinstrument.renderers import SpeedscopeRenderer
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(SpeedscopeRenderer().render(session))
+
+
+def _write_aggregate(key: str, session) -> None:
+    from pyinstrument.renderers import HTMLRenderer
+
+    base = os.path.join(PROFILE_DIR, f"{_slugify(key)}.aggregate")
+    _write_speedscope(base + ".speedscope.json", session)
+    with open(base + ".html", "w", encoding="utf-8") as f:
+        f.write(HTMLRenderer().render(session))
+
+
+def profile_in_thread(fn):
+    """Wrap a sync route function: profile it inside the worker thread when the request is selected."""
+
+    @functools.wraps(fn)    # keeps the signature FastAPI reads parameters from
+    def wrapper(*args, **kwargs):
+        sessions = _thread_sessions.get()
+        if sessions is None:
+            return fn(*args, **kwargs)
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="disabled")
+        profiler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sessions.append(profiler.stop())
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    route_class for routers with sync (def) routes: with PROFILE_ENABLED=1 their functions
+    are wrapped by profile_in_thread; otherwise the route is a plain APIRoute.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if PROFILE_ENABLED and not inspect.iscoroutinefunction(endpoint):
+            endpoint = profile_in_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _route_key(scope) -> str:
+    # After routing, Starlette stores the matched route/endpoint in the scope
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        endpoint = scope.get("endpoint")
+        path = getattr(endpoint, "__name__", None) or scope.get("path", "unknown")
+    return f"{scope.get('method', 'GET')} {path}"
+
+
+def _slugify(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", key).strip("_") or "root"
+
+
+def install_profiler(app, mode: str = "async") -> None:
+    """
+    Add the profiling middleware when PROFILE_ENABLED=1 (mode: "async" or "thread", see above).
+    When disabled nothing is installed, so requests pay no cost at all.
+    """
+    if not PROFILE_ENABLED:
+        return
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        logger.warning("PROFILE_ENABLED=1 but pyinstrument is not installed; profiling disabled.")
+        return
+
+    app.add_middleware(ProfilingMiddleware, mode=mode)
+
+    @app.on_event("shutdown")
+    async def _flush_profiles():
+        # Walk the built middleware stack to find our instance and flush aggregates
+        layer = app.middleware_stack
+        while layer is not None:
+            if isinstance(layer, ProfilingMiddleware):
+                await asyncio.to_thread(layer.flush)
+                return
+            layer = getattr(layer, "app", None)